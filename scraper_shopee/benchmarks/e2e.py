@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import json
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from mock_server import MockShopee
+from extract_roundtrips import CountingDriver
+from metrics import Metrics
+from pacing import Pacer, DEFAULT_DELAYS
+from sessions import SessionPool, browser_pid, process_tree_rss_mb
+from retriv_data import ProductScraper
+
+# End-to-end runs of ProductScraper against the local mock server, one per
+# scrape mode and worker count, with every pacing delay at zero. Reports
+# throughput, WebDriver round trips per product and peak memory of Python plus
+# the browser trees.
+
+MODES = {
+    "index-only": dict(index_only=True),
+    "reviews": dict(index_only=False),
+    "all-star-types": dict(index_only=False, all_star_types=True),
+}
+
+
+class TreeRss:
+    """Samples the resident memory of the browser process trees in the background."""
+
+    def __init__(self, pids, interval=0.5):
+        # pids() returns the root pids to sample, so browsers started later are included.
+        self.pids = pids
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def sample(self):
+        total = sum(process_tree_rss_mb(pid) for pid in set(self.pids()) if pid)
+        self.peak_mb = max(self.peak_mb, total)
+        return total
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.sample()
+        return self.peak_mb
+
+
+def _counter(report, name):
+    return sum(c["value"] for c in report["counters"] if c["name"] == name)
+
+
+def run_mode(mock, mode, workers, args, folder):
+    options = MODES[mode]
+    # Browsers are started before the clock and never recycled, so runs with
+    # more workers only differ in how products are spread over the browsers.
+    pool = SessionPool(size=workers, max_pages=0, max_memory_mb=0, lite=not args.headed)
+    pool.warm()
+    sessions = [pool.lease() for _ in range(workers)]
+    counters = [CountingDriver(session.driver) for session in sessions]
+    for session in sessions:
+        session.driver.implicitly_wait(0)
+    main_session = sessions[0]
+    for session in sessions[1:]:
+        pool.release(session)
+    sampler = TreeRss(lambda: [browser_pid(counter.driver) for counter in counters]).start()
+    metrics = Metrics()
+    pacer = Pacer(delays={phase: (0.0, 0.0) for phase in DEFAULT_DELAYS}, adaptive=False)
+    scraper = ProductScraper(
+        f"bench {mode}", args.products, review_limit=args.reviews, star_limit_per_type=args.star_limit,
+        pacer=pacer, metrics=metrics, base_url=mock.base_url, workers=workers, session_pool=pool,
+        output_file=os.path.join(folder, f"{mode}-{workers}.json"), **options,
+    )
+    calls_before = sum(counter.calls for counter in counters)
+    start = time.perf_counter()
+    try:
+        scraper.run(main_session.driver)
+    finally:
+        elapsed = time.perf_counter() - start
+        browser_mb = sampler.stop()
+        calls = sum(counter.calls for counter in counters) - calls_before
+        pool.release(main_session)
+        pool.close()
+    report = metrics.report()
+    products = _counter(report, "products")
+    reviews = _counter(report, "reviews")
+    return {
+        "mode": mode,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "products": products,
+        "reviews": reviews,
+        "products_per_min": round(products * 60 / elapsed, 1),
+        "reviews_per_min": round(reviews * 60 / elapsed, 1),
+        "calls_per_product": round(calls / products, 1) if products else None,
+        "browser_rss_mb": round(browser_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark against a local mock Shopee")
+    parser.add_argument("--mode", choices=list(MODES) + ["all"], default="all", help="Scrape mode to run")
+    parser.add_argument("-n", "--products", type=int, default=20, help="Products per run")
+    parser.add_argument("-r", "--reviews", type=int, default=30, help="Reviews per product")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1], help="Browser counts to run each mode with, e.g. 1 2 4 (more than 1 uses the parallel path)")
+    parser.add_argument("--star-limit", type=int, default=6, help="Reviews per star filter in all-star-types mode")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the mock server adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of page requests answered with HTTP 500")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Share of page requests redirected to a captcha")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for injected latency, failures and captchas")
+    parser.add_argument("--headed", action="store_true", default=False, help="Use a full browser window instead of lite headless mode")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    mock = MockShopee(latency=args.latency, jitter=args.jitter, fail_rate=args.fail_rate,
+                      captcha_rate=args.captcha_rate, captcha_solve=1.0, seed=args.seed).start()
+    folder = tempfile.mkdtemp(prefix="shopee_e2e_")
+    rows = []
+    try:
+        for mode in (MODES if args.mode == "all" else [args.mode]):
+            for workers in args.workers:
+                rows.append(run_mode(mock, mode, max(1, workers), args, folder))
+    finally:
+        mock.stop()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    python_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    # Speedup is against the single-worker run of the same mode, when there is one.
+    baseline = {row["mode"]: row["products_per_min"] for row in rows if row["workers"] == 1}
+    for row in rows:
+        base = baseline.get(row["mode"])
+        row["speedup"] = round(row["products_per_min"] / base, 2) if base else None
+    print(f"{'mode':<16}{'workers':>8}{'seconds':>9}{'products/min':>14}{'reviews/min':>13}{'speedup':>9}{'calls/product':>15}{'browser MB':>12}")
+    for row in rows:
+        calls = "-" if row["calls_per_product"] is None else row["calls_per_product"]
+        speedup = "-" if row["speedup"] is None else row["speedup"]
+        print(f"{row['mode']:<16}{row['workers']:>8}{row['seconds']:>9}{row['products_per_min']:>14}{row['reviews_per_min']:>13}{speedup:>9}{calls:>15}{row['browser_rss_mb']:>12}")
+    print(f"Peak Python RSS: {python_mb:.1f} MB; mock server: {json.dumps(mock.stats)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": rows, "python_rss_mb": round(python_mb, 1), "server": mock.stats}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import argparse
+import tempfile
+import undetected_chromedriver as uc
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import fixtures
+from retriv_data import ProductScraper
+
+# Reports WebDriver round trips per page for the per-element extraction path
+# and the single execute_script path, using the saved fixture pages.
+
+
+class CountingDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.calls = 0
+        original = driver.execute
+
+        def counted(command, params=None):
+            self.calls += 1
+            return original(command, params)
+
+        # WebElement methods route through their parent's execute, so this
+        # counts element lookups and property reads as well.
+        driver.execute = counted
+
+    def measure(self, fn):
+        start = self.calls
+        result = fn()
+        return self.calls - start, result
+
+
+def write_fixtures(folder):
+    pages = {
+        "search": fixtures.search_page_html("file://" + folder, 0),
+        "product": fixtures.product_page_html("file://" + folder, 1000, 7),
+    }
+    paths = {}
+    for name, content in pages.items():
+        paths[name] = os.path.join(folder, f"{name}.html")
+        with open(paths[name], "w", encoding="utf-8") as f:
+            f.write(content)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WebDriver round trips per page for both extraction paths")
+    parser.add_argument("--headed", action="store_true", default=False, help="Show the browser window")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="shopee_fixtures_")
+    paths = write_fixtures(folder)
+    options = uc.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = uc.Chrome(options=options, headless=not args.headed)
+    driver.implicitly_wait(0)
+    counter = CountingDriver(driver)
+    scraper = ProductScraper("roundtrip bench", 60, False, 30)
+
+    rows = []
+    driver.get("file://" + paths["search"])
+    for fast in (False, True):
+        scraper.fast_extract = fast
+        calls, cards = counter.measure(lambda: scraper._extract_product_cards(driver, 60))
+        rows.append(("product_list", "script" if fast else "per-element", calls, len(cards or [])))
+
+    driver.get("file://" + paths["product"])
+    for fast in (False, True):
+        scraper.fast_extract = fast
+        calls, page = counter.measure(lambda: scraper._read_product_page(driver))
+        rows.append(("product_detail", "script" if fast else "per-element", calls, len(page["rating_filters"])))
+        container = driver.find_element(By.CLASS_NAME, "product-ratings__list")
+        calls, reviews = counter.measure(lambda: scraper._extract_reviews(driver, container, 100))
+        rows.append(("review", "script" if fast else "per-element", calls, len(reviews)))
+
+    driver.quit()
+    print(f"{'page':<16}{'path':<14}{'round trips':>12}{'records':>10}")
+    for page, path, calls, records in rows:
+        print(f"{page:<16}{path:<14}{calls:>12}{records:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import html
+
+# Synthetic Shopee pages laid out exactly like the live DOM that the XPaths in
+# src/extractors.py target. Used by the benchmarks instead of the real site.
+
+REVIEW_STYLE = ("position: relative; box-sizing: border-box; margin: 15px 0px; font-size: 14px; "
+                "line-height: 20px; color: rgba(0, 0, 0, 0.87); word-break: break-word; white-space: pre-wrap;")
+REVIEWS_PER_PAGE = 6
+
+
+def product_link(base_url, shopid, itemid):
+    return f"{base_url}/Mock-Product-{itemid}-i.{shopid}.{itemid}"
+
+
+def _card(base_url, shopid, itemid):
+    link = product_link(base_url, shopid, itemid)
+    return f"""
+<li><a class="contents" href="{link}"><div>
+  <img class="inset-y-0 w-full h-full pointer-events-none object-contain absolute" src="{base_url}/img/{itemid}.webp">
+  <div class="line-clamp-2 break-words">Mock Product {itemid}</div>
+  <div class="truncate flex items-baseline"><span>₱</span><span>{1000 + itemid % 900:,}</span></div>
+  <div class="text-shopee-black87 text-xs/sp14 flex-none">4.{itemid % 10}</div>
+  <div class="flex-shrink min-w-0 truncate text-shopee-black54 font-extralight text-sp10">Metro Manila</div>
+</div></a></li>"""
+
+
+def search_page_html(base_url, page, per_page=60, shopid=1000):
+    cards = "".join(_card(base_url, shopid, page * per_page + i + 1) for i in range(per_page))
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>search</title></head><body>
+<div id="main"><div><div></div><div><div><div><div><div><div><div></div><div><section>
+<ul>{cards}</ul>
+</section></div></div></div></div></div></div></div></div></div>
+</body></html>"""
+
+
+def _review(shopid, itemid, idx, stars, star_filter=None):
+    # Each star filter lists its own reviews, so switching filters changes the list like on the live site.
+    tag = f"{star_filter}star_" if star_filter else ""
+    solid = "".join('<svg class="shopee-svg-icon icon-rating-solid--active icon-rating-solid"></svg>' for _ in range(stars))
+    hollow = "".join('<svg class="shopee-svg-icon icon-rating"></svg>' for _ in range(5 - stars))
+    return f"""
+<div class="shopee-product-rating"><div class="shopee-product-rating__main">
+  <a class="shopee-product-rating__author-name">buyer_{itemid}_{tag}{idx}</a>
+  <div class="shopee-product-rating__rating">{solid}{hollow}</div>
+  <div class="shopee-product-rating__time">2025-10-{1 + idx % 28:02d} 12:{idx % 60:02d} | Variation: Default</div>
+  <div style="{REVIEW_STYLE}">{html.escape(f"Review {idx} for item {itemid}{f' ({star_filter} star)' if star_filter else ''}: works as described.")}</div>
+  <div class="TQTPT9"><div class="qiTixQ">{"Thank you!" if idx % 3 == 0 else ""}</div></div>
+  <div class="shopee-product-rating__like-count">{idx % 7}</div>
+</div></div>"""
+
+
+def star_counts(itemid):
+    # Deterministic per-item star distribution: 5 stars dominate, 1 star is rare.
+    base = 3 + itemid % 5
+    return {5: base * 4, 4: base * 2, 3: base, 2: 1 + base // 3, 1: base // 4}
+
+
+def review_list_html(shopid, itemid, review_page=0, star=None):
+    counts = star_counts(itemid)
+    pool = sum(counts.values()) if star is None else counts[star]
+    first = review_page * REVIEWS_PER_PAGE
+    return "".join(_review(shopid, itemid, i, star or (5 - i % 5), star) for i in range(first, min(first + REVIEWS_PER_PAGE, pool)))
+
+
+def pager_html(itemid, review_page=0, star=None):
+    counts = star_counts(itemid)
+    pool = sum(counts.values()) if star is None else counts[star]
+    last_page = max(0, (pool - 1) // REVIEWS_PER_PAGE)
+    buttons = "".join(
+        f'<button class="shopee-button-{"solid shopee-button-solid--primary" if p == review_page else "no-outline"}">{p + 1}</button>'
+        for p in range(last_page + 1)
+    )
+    next_btn = "" if review_page >= last_page else '<button class="shopee-icon-button shopee-icon-button--right"><svg class="shopee-svg-icon icon-arrow-right"></svg></button>'
+    return buttons + next_btn
+
+
+def product_page_html(base_url, shopid, itemid, review_page=0, star=None):
+    counts = star_counts(itemid)
+    total = sum(counts.values())
+    filters = [f'<div class="product-rating-overview__filter" data-star="">Tất cả ({total})</div>']
+    filters += [f'<div class="product-rating-overview__filter" data-star="{s}">{s} Sao ({counts[s]})</div>' for s in (5, 4, 3, 2, 1)]
+    reviews = review_list_html(shopid, itemid, review_page, star)
+    pager = pager_html(itemid, review_page, star)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>item {itemid}</title></head><body>
+<div id="sll2-normal-pdp-main"><div>
+<div><div>
+  <div></div>
+  <div>
+    <div></div>
+    <div><div><div><div>
+      <section><div>Home &gt; Computers &gt; Mock Category {itemid % 7}</div></section>
+      <section><div><div>Description of mock product {itemid}.</div></div></section>
+    </div></div></div></div>
+    <div><div><div><div></div><div><div><div><div></div><div><div></div><div>
+      {"".join(filters)}
+    </div></div></div></div></div></div>
+      <div class="product-ratings__list">{reviews}</div>
+      <div class="shopee-page-controller product-ratings__page-controller">{pager}</div>
+    </div></div>
+  </div>
+</div></div>
+</div></div>
+</body></html>"""
@@ -0,0 +1,150 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import fixtures
+
+# Local stand-in for shopee.ph built from the fixture pages: search pages,
+# product pages whose review list pages and star filters switch in place
+# like the live site, and captcha redirects. Latency and failures can be
+# injected per request.
+
+ITEM_PATH = re.compile(r"-i\.(\d+)\.(\d+)$")
+
+REVIEW_SCRIPT = """
+<script>
+(function () {
+  var state = {page: 0, star: ''};
+  function load(page, star) {
+    var url = '/_reviews?shopid=%(shopid)d&itemid=%(itemid)d&page=' + page + '&star=' + star;
+    fetch(url).then(function (r) { return r.json(); }).then(function (data) {
+      document.querySelector('.product-ratings__list').innerHTML = data.list;
+      document.querySelector('.shopee-page-controller').innerHTML = data.pager;
+      state.page = page;
+      state.star = star;
+    });
+  }
+  document.addEventListener('click', function (e) {
+    var filter = e.target.closest('.product-rating-overview__filter');
+    if (filter) return load(0, filter.getAttribute('data-star') || '');
+    var button = e.target.closest('.shopee-page-controller button');
+    if (!button) return;
+    if (button.classList.contains('shopee-icon-button--right')) return load(state.page + 1, state.star);
+    var n = parseInt(button.textContent, 10);
+    if (!isNaN(n)) load(n - 1, state.star);
+  });
+})();
+</script>
+"""
+
+CAPTCHA_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="%(solve)s;url=%(next)s">
+<title>verify</title></head><body><div id="captcha">Please verify you are human.</div></body></html>"""
+
+
+class MockShopee:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, fail_rate=0.0, captcha_rate=0.0, captcha_solve=1.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.captcha_rate = captcha_rate
+        self.captcha_solve = captcha_solve
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "failures": 0, "captchas": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+
+    def _roll(self, rate):
+        with self._lock:
+            return rate and self.random.random() < rate
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                mock._count("requests")
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if mock.latency or mock.jitter:
+                    time.sleep(mock.latency + mock.random.uniform(0, mock.jitter))
+
+                if url.path.startswith("/verify/captcha"):
+                    next_url = query.get("next", ["/"])[0]
+                    return self._send(200, CAPTCHA_PAGE % {"solve": mock.captcha_solve, "next": next_url})
+                if url.path == "/_reviews":
+                    star = query.get("star", [""])[0]
+                    args = (int(query["shopid"][0]), int(query["itemid"][0]), int(query.get("page", ["0"])[0]), int(star) if star else None)
+                    body = json.dumps({"list": fixtures.review_list_html(*args), "pager": fixtures.pager_html(*args[1:])})
+                    return self._send(200, body, "application/json")
+
+                is_page = url.path == "/search" or ITEM_PATH.search(url.path)
+                if is_page and mock._roll(mock.fail_rate):
+                    mock._count("failures")
+                    return self._send(500, "<html><body>Internal Server Error</body></html>")
+                if is_page and mock._roll(mock.captcha_rate):
+                    mock._count("captchas")
+                    return self._send(302, "", headers={"Location": "/verify/captcha?next=" + quote(self.path, safe="")})
+
+                if url.path == "/search":
+                    page = int(query.get("page", ["0"])[0])
+                    return self._send(200, fixtures.search_page_html(mock.base_url, page))
+                match = ITEM_PATH.search(url.path)
+                if match:
+                    shopid, itemid = int(match.group(1)), int(match.group(2))
+                    html = fixtures.product_page_html(mock.base_url, shopid, itemid)
+                    script = REVIEW_SCRIPT % {"shopid": shopid, "itemid": itemid}
+                    return self._send(200, html.replace("</body>", script + "</body>"))
+                return self._send(404, "<html><body>Not found</body></html>")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fixture Shopee pages locally")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of page requests answered with HTTP 500")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Share of page requests redirected to a captcha")
+    parser.add_argument("--captcha-solve", type=float, default=1.0, help="Seconds until the captcha page sends the browser back")
+    args = parser.parse_args()
+    mock = MockShopee(port=args.port, latency=args.latency, jitter=args.jitter, fail_rate=args.fail_rate,
+                      captcha_rate=args.captcha_rate, captcha_solve=args.captcha_solve).start()
+    print(f"Mock Shopee on {mock.base_url} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
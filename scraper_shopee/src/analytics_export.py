@@ -0,0 +1,290 @@
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import quote
+from output_sink import JsonlSink
+from product_store import ProductStore, parse_item_ids, product_key, review_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+# Turns scraper output (JSON, JSONL or a SQLite store) into typed, columnar
+# products and reviews tables. Records are read in batches; prices, counts,
+# ratings and review times are parsed with Arrow compute kernels over whole
+# columns, and each batch is appended to a Parquet (or Arrow IPC) dataset
+# partitioned by keyword and scrape date.
+
+RATING_KEYS = {
+    "tất_cả": "all",
+    "có_bình_luận": "commented",
+    "có_hình_ảnh_/_video": "media",
+    "with_comments": "commented",
+    "with_media": "media",
+}
+RATING_COLUMNS = ["all", "5_star", "4_star", "3_star", "2_star", "1_star", "commented", "media"]
+INT_COLUMNS = {"shopid", "itemid", "total_rating", "review_count", "rating", "like_count", "ctime"} | {f"ratings_{name}" for name in RATING_COLUMNS}
+NUMBER = r"\d+(?:\.\d+)?"
+SCALE = r"[kKmM]?"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for analytics export: pip install pyarrow")
+
+
+def _is_store(path):
+    return path.endswith(".db") or path.endswith(".sqlite")
+
+
+def iter_source(path, keyword=None, with_times=False):
+    if _is_store(path):
+        yield from ProductStore(path, keyword).iter_products(with_times=with_times)
+    elif path.endswith(".jsonl"):
+        yield from JsonlSink(path).iter_records()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value):
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _category(value):
+    # --category runs store the whole category row instead of the page text.
+    if isinstance(value, dict):
+        from category_index import category_path
+        return " > ".join(category_path(value))
+    return _text(value)
+
+
+def _file_date(path):
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+
+
+def _row_date(record, default):
+    # Store rows carry the time they were first scraped; plain files fall back to one date.
+    scraped_at = record.get("scraped_at")
+    if isinstance(scraped_at, (int, float)):
+        return datetime.fromtimestamp(scraped_at).strftime("%Y-%m-%d")
+    return default
+
+
+def _rating_counts(detailed):
+    counts = {}
+    for key, value in (detailed or {}).items():
+        counts[RATING_KEYS.get(key, key)] = value
+    return counts
+
+
+def _columns_table(cols):
+    # Explicit types keep every batch on the same schema, even when a column is all null.
+    return pa.table({k: pa.array(v, type=pa.int64() if k in INT_COLUMNS else pa.string()) for k, v in cols.items()})
+
+
+def _blank_to_null(arr):
+    return pc.if_else(pc.equal(arr, ""), pa.scalar(None, arr.type), arr)
+
+
+def _scaled(numbers, suffixes):
+    value = pc.cast(_blank_to_null(numbers), pa.float64())
+    suffix = pc.utf8_lower(suffixes)
+    factor = pc.if_else(pc.equal(suffix, "k"), 1e3, pc.if_else(pc.equal(suffix, "m"), 1e6, 1.0))
+    return pc.multiply(value, factor)
+
+
+def parse_prices(texts):
+    """"₱\\n1,499", "₱1.2k", "₱100 - ₱250" or 1499.0 -> (min, max) float columns."""
+    cleaned = pc.replace_substring_regex(pc.cast(texts, pa.string()), r"[^0-9.kKmM\-]", "")
+    parts = pc.extract_regex(cleaned, rf"^(?P<lo>{NUMBER})(?P<lo_s>{SCALE})(?:-(?P<hi>{NUMBER})(?P<hi_s>{SCALE}))?")
+    low = _scaled(pc.struct_field(parts, "lo"), pc.struct_field(parts, "lo_s"))
+    high = _scaled(pc.struct_field(parts, "hi"), pc.struct_field(parts, "hi_s"))
+    return low, pc.coalesce(high, low)
+
+
+def parse_counts(texts):
+    """"1.2k sold", "10k+", "987" or 987 -> int64 column."""
+    cleaned = pc.replace_substring(pc.cast(texts, pa.string()), ",", "")
+    parts = pc.extract_regex(cleaned, rf"(?P<n>{NUMBER})(?P<s>{SCALE})")
+    return pc.cast(pc.round(_scaled(pc.struct_field(parts, "n"), pc.struct_field(parts, "s"))), pa.int64())
+
+
+def parse_ratings(texts):
+    parts = pc.extract_regex(pc.cast(texts, pa.string()), rf"(?P<v>{NUMBER})")
+    return pc.cast(_blank_to_null(pc.struct_field(parts, "v")), pa.float64())
+
+
+def parse_review_times(texts, ctimes):
+    """Review "time" text ("2024-05-12 14:33 | Variation: Black") -> timestamp and
+    variation columns; API epoch ctime wins when present."""
+    texts = pc.cast(texts, pa.string())
+    stamp = pc.struct_field(pc.extract_regex(texts, r"(?P<t>\d{4}-\d{2}-\d{2} \d{2}:\d{2})"), "t")
+    parsed = pc.strptime(stamp, format="%Y-%m-%d %H:%M", unit="s", error_is_null=True)
+    from_ctime = pc.cast(pc.cast(ctimes, pa.int64()), pa.timestamp("s"))
+    variation = pc.struct_field(pc.extract_regex(texts, r"Variation:\s*(?P<v>.+)$"), "v")
+    return pc.coalesce(from_ctime, parsed), pc.utf8_trim_whitespace(variation)
+
+
+def products_table(records, keyword, scrape_date):
+    _require_pyarrow()
+    cols = {name: [] for name in (
+        "product_key", "shopid", "itemid", "link", "name", "price_raw", "price_min_raw", "price_max_raw",
+        "rating_raw", "sold_raw", "location", "img", "category", "description", "total_rating", "review_count",
+        "scrape_date",
+    )}
+    for name in RATING_COLUMNS:
+        cols[f"ratings_{name}"] = []
+    for prod in records:
+        link = prod.get("link")
+        shopid, itemid = parse_item_ids(link)
+        counts = _rating_counts(prod.get("detailed_rating"))
+        cols["product_key"].append(product_key(link))
+        cols["shopid"].append(prod.get("shopid") or shopid)
+        cols["itemid"].append(prod.get("itemid") or itemid)
+        cols["link"].append(link)
+        cols["name"].append(prod.get("name"))
+        cols["price_raw"].append(_text(prod.get("price")))
+        cols["price_min_raw"].append(_text(prod.get("price_min")))
+        cols["price_max_raw"].append(_text(prod.get("price_max")))
+        cols["rating_raw"].append(_text(prod.get("rating")))
+        cols["sold_raw"].append(_text(prod.get("sold")))
+        cols["location"].append(prod.get("location"))
+        cols["img"].append(prod.get("img"))
+        cols["category"].append(_category(prod.get("category")))
+        cols["description"].append(prod.get("description"))
+        cols["total_rating"].append(prod.get("total_rating"))
+        cols["review_count"].append(len(prod["comments"]) if "comments" in prod else None)
+        cols["scrape_date"].append(_row_date(prod, scrape_date))
+        for name in RATING_COLUMNS:
+            cols[f"ratings_{name}"].append(counts.get(name))
+    raw = _columns_table(cols)
+
+    price_low, price_high = parse_prices(raw["price_raw"])
+    api_low, _ = parse_prices(raw["price_min_raw"])
+    _, api_high = parse_prices(raw["price_max_raw"])
+    n = raw.num_rows
+    table = raw.drop(["price_raw", "price_min_raw", "price_max_raw", "rating_raw", "sold_raw"])
+    table = table.append_column("price_min", pc.coalesce(api_low, price_low))
+    table = table.append_column("price_max", pc.coalesce(api_high, price_high))
+    table = table.append_column("rating", parse_ratings(raw["rating_raw"]))
+    table = table.append_column("sold", parse_counts(raw["sold_raw"]))
+    return table.append_column("keyword", pa.array([keyword] * n, pa.string()))
+
+
+def reviews_table(records, keyword, scrape_date):
+    _require_pyarrow()
+    cols = {name: [] for name in (
+        "product_key", "shopid", "itemid", "review_key", "author", "rating", "time_raw", "ctime",
+        "content", "seller_respond", "like_count", "scrape_date",
+    )}
+    for prod in records:
+        key = product_key(prod.get("link"))
+        shopid, itemid = parse_item_ids(prod.get("link"))
+        for review in prod.get("comments") or []:
+            cols["product_key"].append(key)
+            cols["shopid"].append(review.get("shopid") or shopid)
+            cols["itemid"].append(review.get("itemid") or itemid)
+            cols["review_key"].append(review_key(review))
+            cols["author"].append(review.get("author"))
+            cols["rating"].append(review.get("rating"))
+            cols["time_raw"].append(_text(review.get("time")))
+            cols["ctime"].append(review.get("ctime"))
+            cols["content"].append(review.get("content"))
+            cols["seller_respond"].append(review.get("seller_respond"))
+            cols["like_count"].append(review.get("like_count"))
+            cols["scrape_date"].append(_row_date(review, scrape_date))
+    raw = _columns_table(cols)
+    time_col, variation = parse_review_times(raw["time_raw"], raw["ctime"])
+    n = raw.num_rows
+    table = raw.drop(["time_raw", "ctime"])
+    table = table.append_column("time", time_col)
+    table = table.append_column("variation", variation)
+    return table.append_column("keyword", pa.array([keyword] * n, pa.string()))
+
+
+def _write(table, root, fmt, part, cleared):
+    if not table.num_rows:
+        return
+    # An export replaces each partition it writes to: the first time this run
+    # touches one, the files of earlier exports are removed.
+    for keyword, scrape_date in set(zip(table["keyword"].to_pylist(), table["scrape_date"].to_pylist())):
+        folder = os.path.join(root, f"keyword={quote(keyword, safe='')}", f"scrape_date={quote(scrape_date, safe='')}")
+        if folder not in cleared:
+            cleared.add(folder)
+            shutil.rmtree(folder, ignore_errors=True)
+    ds.write_dataset(
+        table,
+        root,
+        format=fmt,
+        partitioning=["keyword", "scrape_date"],
+        partitioning_flavor="hive",
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template=f"part-{part}-{{i}}.{'parquet' if fmt == 'parquet' else 'arrow'}",
+    )
+
+
+def export(source, out_dir, keyword, scrape_date=None, fmt="parquet", batch_size=2000):
+    """scrape_date puts every row in one partition. Without it, store rows are
+    partitioned by the date they were scraped and files by their modification date."""
+    _require_pyarrow()
+    products = reviews = 0
+    cleared = set()
+    records = iter_source(source, keyword, with_times=scrape_date is None)
+    default_date = scrape_date or _file_date(source)
+    for number, batch in enumerate(_batches(records, batch_size)):
+        part = f"{number:05d}"
+        ptable = products_table(batch, keyword, default_date)
+        rtable = reviews_table(batch, keyword, default_date)
+        _write(ptable, os.path.join(out_dir, "products"), fmt, part, cleared)
+        _write(rtable, os.path.join(out_dir, "reviews"), fmt, part, cleared)
+        products += ptable.num_rows
+        reviews += rtable.num_rows
+    return products, reviews
+
+
+def _default_keyword(source):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return stem[len("shopee_"):] if stem.startswith("shopee_") else stem
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Export scraped products and reviews as typed Parquet/Arrow tables")
+    parser.add_argument("source", help="Output JSON, JSONL file or SQLite store")
+    parser.add_argument("-o", "--output", required=True, help="Dataset directory (products/ and reviews/ are created inside)")
+    parser.add_argument("-k", "--keyword", default=None, help="Keyword partition (default: from the file name; required for a store)")
+    parser.add_argument("--date", default=None, help="Scrape date partition, YYYY-MM-DD (default: each store row's scrape date, or the file's modification date)")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet", help="File format of the dataset")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Products parsed and written per batch")
+    args = parser.parse_args()
+
+    if _is_store(args.source) and not args.keyword:
+        parser.error("--keyword is required when exporting from a store")
+    keyword = args.keyword or _default_keyword(args.source)
+    total_products, total_reviews = export(args.source, args.output, keyword, args.date, "ipc" if args.format == "arrow" else "parquet", args.batch_size)
+    logging.info(f"Exported {total_products} products and {total_reviews} reviews to {args.output}")
@@ -0,0 +1,284 @@
+import re
+import sys
+import json
+import time
+import base64
+import logging
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+
+# Captures Shopee's own JSON API responses through CDP network events, so the
+# scraper can read typed prices, rating counts and reviews instead of DOM text.
+# Captures can be recorded to a HAR-like file and replayed offline.
+
+API_PATTERNS = {
+    "search": re.compile(r"/api/v4/search/search_items"),
+    "item": re.compile(r"/api/v4/(pdp/get_pc|item/get)\b"),
+    "ratings": re.compile(r"/api/v2/item/get_ratings"),
+}
+PRICE_UNIT = 100000
+IMAGE_BASE = "https://down-ph.img.susercontent.com/file/"
+
+
+def api_kind(url):
+    for kind, pattern in API_PATTERNS.items():
+        if pattern.search(url):
+            return kind
+    return None
+
+
+class HarRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def add(self, url, status, text):
+        entry = {
+            "startedDateTime": datetime.now().astimezone().isoformat(),
+            "request": {"method": "GET", "url": url},
+            "response": {"status": status, "content": {"mimeType": "application/json", "text": text}},
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def save(self):
+        with self._lock:
+            har = {"log": {"version": "1.2", "creator": {"name": "shopee-scraper", "version": "1"}, "entries": self.entries}}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(har, f, ensure_ascii=False)
+        logging.info(f"Recorded {len(har['log']['entries'])} API responses to {self.path}")
+
+
+class ApiCapture:
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+        self.driver = None
+        self._pending = {}
+        self._finished = []
+        self._responses = []
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        # Requires a driver created with enable_cdp_events=True.
+        self.driver = driver
+        driver.add_cdp_listener("Network.responseReceived", self._on_response)
+        driver.add_cdp_listener("Network.loadingFinished", self._on_finished)
+        driver.execute_cdp_cmd("Network.enable", {})
+        return self
+
+    def _on_response(self, message):
+        params = message.get("params", {})
+        response = params.get("response", {})
+        kind = api_kind(response.get("url", ""))
+        if kind:
+            with self._lock:
+                self._pending[params.get("requestId")] = (kind, response["url"], response.get("status", 0))
+
+    def _on_finished(self, message):
+        request_id = message.get("params", {}).get("requestId")
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+            if entry:
+                self._finished.append((request_id, entry))
+
+    def _drain(self):
+        # Bodies are fetched from the calling thread, not the CDP listener thread,
+        # so WebDriver commands never interleave with the event loop.
+        with self._lock:
+            finished, self._finished = self._finished, []
+        for request_id, (kind, url, status) in finished:
+            try:
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                text = body.get("body", "")
+                if body.get("base64Encoded"):
+                    text = base64.b64decode(text).decode("utf-8")
+                data = json.loads(text)
+            except Exception as e:
+                logging.warning(f"Could not read API response {url}: {e}")
+                continue
+            if self.recorder:
+                self.recorder.add(url, status, text)
+            self._responses.append((kind, url, data))
+
+    def clear(self):
+        self._drain()
+        self._responses = []
+
+    def take(self, kind):
+        self._drain()
+        matches = [r for r in self._responses if r[0] == kind]
+        self._responses = [r for r in self._responses if r[0] != kind]
+        return matches
+
+    def wait_for(self, kind, timeout=10):
+        deadline = time.time() + timeout
+        while True:
+            matches = self.take(kind)
+            if matches or time.time() >= deadline:
+                return matches
+            time.sleep(0.2)
+
+
+def load_har(path):
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+    for entry in har.get("log", {}).get("entries", []):
+        url = entry.get("request", {}).get("url", "")
+        kind = api_kind(url)
+        content = entry.get("response", {}).get("content", {})
+        text = content.get("text")
+        if not kind or not text:
+            continue
+        if content.get("encoding") == "base64":
+            text = base64.b64decode(text).decode("utf-8")
+        try:
+            yield kind, url, json.loads(text)
+        except ValueError:
+            logging.warning(f"Skipping non-JSON HAR entry: {url}")
+
+
+def _price(value):
+    return None if value is None else value / PRICE_UNIT
+
+
+def _ids_from_url(url):
+    query = parse_qs(urlparse(url).query)
+    shopid = (query.get("shopid") or query.get("shop_id") or [None])[0]
+    itemid = (query.get("itemid") or query.get("item_id") or [None])[0]
+    return (int(shopid) if shopid else None), (int(itemid) if itemid else None)
+
+
+def product_link(shopid, itemid, name="", base_url="https://shopee.ph"):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")
+    return f"{base_url.rstrip('/')}/{slug}-i.{shopid}.{itemid}"
+
+
+def _origin(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else "https://shopee.ph"
+
+
+def parse_search_items(data, base_url="https://shopee.ph"):
+    items = data.get("items") or (data.get("data") or {}).get("items") or []
+    products = []
+    for it in items:
+        basic = it.get("item_basic") or it
+        rating = basic.get("item_rating") or {}
+        products.append({
+            "link": product_link(basic.get("shopid"), basic.get("itemid"), basic.get("name", ""), base_url),
+            "name": basic.get("name", ""),
+            "price": _price(basic.get("price")),
+            "price_min": _price(basic.get("price_min")),
+            "price_max": _price(basic.get("price_max")),
+            "rating": rating.get("rating_star"),
+            "img": IMAGE_BASE + basic["image"] if basic.get("image") else "",
+            "location": basic.get("shop_location", ""),
+            "shopid": basic.get("shopid"),
+            "itemid": basic.get("itemid"),
+            "sold": basic.get("historical_sold", basic.get("sold")),
+        })
+    return products
+
+
+def _rating_counts(rating):
+    counts = rating.get("rating_count") or []
+    detailed = {}
+    if counts:
+        detailed["all"] = counts[0]
+    for star in range(5, 0, -1):
+        if len(counts) > star:
+            detailed[f"{star}_star"] = counts[star]
+    if rating.get("rcount_with_context") is not None:
+        detailed["commented"] = rating["rcount_with_context"]
+    if rating.get("rcount_with_image") is not None:
+        detailed["media"] = rating["rcount_with_image"]
+    return detailed, sum(counts[1:6])
+
+
+def parse_item(data):
+    payload = data.get("data") or data
+    item = payload.get("item") or payload
+    categories = item.get("categories") or item.get("fe_categories") or []
+    rating = item.get("item_rating") or (payload.get("product_review") or {})
+    detailed, total = _rating_counts(rating)
+    return {
+        "shopid": item.get("shopid"),
+        "itemid": item.get("itemid"),
+        "category": " > ".join(c.get("display_name", "") for c in categories),
+        "description": item.get("description", ""),
+        "price": _price(item.get("price")),
+        "price_min": _price(item.get("price_min")),
+        "price_max": _price(item.get("price_max")),
+        "detailed_rating": detailed,
+        "total_rating": total,
+    }
+
+
+def parse_ratings(data):
+    reviews = []
+    for r in (data.get("data") or {}).get("ratings") or []:
+        reply = r.get("ItemRatingReply") or {}
+        ctime = r.get("ctime")
+        reviews.append({
+            "author": r.get("author_username", ""),
+            "rating": r.get("rating_star", 0),
+            "time": datetime.fromtimestamp(ctime).strftime("%Y-%m-%d %H:%M") if ctime else "",
+            "content": r.get("comment", ""),
+            "seller_respond": reply.get("comment", ""),
+            "like_count": r.get("like_count") or 0,
+            "cmtid": r.get("cmtid"),
+            "ctime": ctime,
+            "itemid": r.get("itemid"),
+            "shopid": r.get("shopid"),
+        })
+    return reviews
+
+
+def build_products(responses, base_url=None):
+    # Without a base URL, links point at the site each response was captured from.
+    products = {}
+    order = []
+    seen_reviews = {}
+    for kind, url, data in responses:
+        if kind == "search":
+            for product in parse_search_items(data, base_url or _origin(url)):
+                if product["itemid"] not in products:
+                    products[product["itemid"]] = product
+                    order.append(product["itemid"])
+        elif kind == "item":
+            details = parse_item(data)
+            itemid = details["itemid"] or _ids_from_url(url)[1]
+            product = products.setdefault(itemid, {"link": product_link(details["shopid"], itemid, base_url=base_url or _origin(url)), "itemid": itemid})
+            if itemid not in order:
+                order.append(itemid)
+            product.update({k: v for k, v in details.items() if v is not None})
+        elif kind == "ratings":
+            for review in parse_ratings(data):
+                itemid = review["itemid"] or _ids_from_url(url)[1]
+                if itemid not in products:
+                    continue
+                seen = seen_reviews.setdefault(itemid, set())
+                if review["cmtid"] is not None and review["cmtid"] in seen:
+                    continue
+                seen.add(review["cmtid"])
+                products[itemid].setdefault("comments", []).append(review)
+    return [products[itemid] for itemid in order]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Replay a recorded Shopee API capture (HAR) into product JSON")
+    parser.add_argument("har", help="HAR file from --record-har or Chrome DevTools")
+    parser.add_argument("-o", "--output", required=True, help="Output JSON file")
+    args = parser.parse_args()
+    products = build_products(load_har(args.har))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+    logging.info(f"Replayed {len(products)} products into {args.output}")
@@ -0,0 +1,158 @@
+import sys
+import json
+import time
+import logging
+import threading
+import urllib.request
+from contextlib import nullcontext
+
+# Captcha and login walls. A blocked session is parked: its work goes back to
+# the queue for the other sessions, the notifiers are told, and the session
+# polls its own URL until someone solves the challenge in that window (or the
+# timeout passes). Nothing waits on stdin, so unattended runs keep going.
+
+BLOCKED_URL_MARKERS = ["captcha", "/buyer/login", "/user/login", "/account/login", "/verify", "security"]
+
+
+def is_blocked(url):
+    url = (url or "").lower()
+    return any(x in url for x in BLOCKED_URL_MARKERS)
+
+
+class CaptchaBlocked(Exception):
+    """Raised when a session hits a captcha and its work should move elsewhere,
+    or when a parked session was not cleared in time."""
+
+    def __init__(self, url, session=None):
+        super().__init__(f"Captcha or login wall on {session or 'session'}: {url}")
+        self.url = url
+        self.session = session
+
+
+class CliNotifier:
+    def __call__(self, info):
+        session = info["session"]
+        if info["event"] == "parked":
+            logging.warning(f"[{session}] Captcha or login detected at {info['url']}. Solve it in that browser window; the session resumes by itself.")
+            sys.stderr.write("\a")
+            sys.stderr.flush()
+        elif info["event"] == "cleared":
+            logging.info(f"[{session}] Captcha cleared after {info['waited']}s, resuming")
+        else:
+            logging.warning(f"[{session}] Captcha not cleared after {info['waited']}s, giving up on this session")
+
+
+class FileNotifier:
+    """Appends one JSON line per event, for a watcher script or a tail -f."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, info):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(info, ensure_ascii=False) + "\n")
+
+
+class WebhookNotifier:
+    """POSTs each event as JSON. Sent from a background thread so a slow
+    endpoint never holds up scraping; failures are only logged."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, info):
+        request = urllib.request.Request(self.url, data=json.dumps(info).encode("utf-8"), headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except Exception as e:
+            logging.warning(f"Captcha webhook {self.url} failed: {e}")
+
+    def __call__(self, info):
+        threading.Thread(target=self._post, args=(info,), daemon=True).start()
+
+
+def make_notifier(spec):
+    """"cli", "file:PATH" or "webhook:URL" -> notifier (argparse type)."""
+    kind, _, target = spec.partition(":")
+    if kind == "cli" and not target:
+        return CliNotifier()
+    if kind == "file" and target:
+        return FileNotifier(target)
+    if kind == "webhook" and target:
+        return WebhookNotifier(target)
+    raise ValueError(f"Unknown captcha notifier '{spec}' (use cli, file:PATH or webhook:URL)")
+
+
+def _current_url(driver):
+    try:
+        return driver.current_url
+    except Exception:
+        return None
+
+
+class CaptchaHandler:
+    def __init__(self, notifiers=None, timeout=None, poll_interval=2.0, metrics=None):
+        # timeout=None waits until the challenge is solved, however long that takes.
+        self.notifiers = list(notifiers) if notifiers else [CliNotifier()]
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.metrics = metrics
+        self.parked = {}
+        self.stats = {"parked": 0, "cleared": 0, "timed_out": 0, "blocked_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def notify(self, event, session, url, **extra):
+        info = dict(event=event, session=session, url=url, time=round(time.time(), 3), **extra)
+        for notifier in self.notifiers:
+            try:
+                notifier(info)
+            except Exception as e:
+                logging.warning(f"Captcha notifier {type(notifier).__name__} failed: {e}")
+
+    def _set_parked(self, session, url=None):
+        with self._lock:
+            if url is None:
+                self.parked.pop(session, None)
+            else:
+                self.parked[session] = url
+                self.stats["parked"] += 1
+            count = len(self.parked)
+        if self.metrics:
+            self.metrics.set_gauge("parked_sessions", count)
+
+    def park(self, driver, session):
+        """Blocks the calling session (only) until its page leaves the
+        captcha/login URL. Returns False if the timeout passed or the browser died."""
+        url = _current_url(driver)
+        start = time.time()
+        self._set_parked(session, url)
+        self.notify("parked", session, url)
+        cleared = False
+        try:
+            with self.metrics.span("captcha_wait") if self.metrics else nullcontext():
+                while True:
+                    current = _current_url(driver)
+                    if current is None:
+                        break
+                    if not is_blocked(current):
+                        cleared = True
+                        break
+                    if self.timeout is not None and time.time() - start >= self.timeout:
+                        break
+                    time.sleep(self.poll_interval)
+        finally:
+            waited = time.time() - start
+            self._set_parked(session)
+            with self._lock:
+                self.stats["cleared" if cleared else "timed_out"] += 1
+                self.stats["blocked_seconds"] += waited
+        if self.metrics:
+            self.metrics.incr("captcha_parked", result="cleared" if cleared else "timed_out")
+        self.notify("cleared" if cleared else "timed_out", session, url, waited=round(waited, 1))
+        return cleared
+
+    def summary(self):
+        with self._lock:
+            return dict(self.stats, blocked_seconds=round(self.stats["blocked_seconds"], 1), parked_now=sorted(self.parked))
@@ -0,0 +1,164 @@
+import os
+import sys
+import csv
+import pickle
+import logging
+import argparse
+
+# In-memory index over shopee_categories.csv: id -> row plus the level 1..5
+# tree, so category lookups never rescan the CSV. The parsed rows are cached
+# next to the CSV in a pickle that is rebuilt whenever the CSV changes.
+
+LEVELS = ("nganh_cap_1", "nganh_cap_2", "nganh_cap_3", "nganh_cap_4", "nganh_cap_5")
+ID_FIELD = "ma_nganh"
+CACHE_VERSION = 1
+DEFAULT_CSV = "shopee_categories.csv"
+PATH_SEP = " > "
+
+_indexes = {}
+
+
+def default_csv_path():
+    # The working directory wins for compatibility; otherwise use the copy shipped with the repo.
+    if os.path.exists(DEFAULT_CSV):
+        return DEFAULT_CSV
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", DEFAULT_CSV)
+
+
+def category_path(row):
+    return tuple(row[level] for level in LEVELS if row.get(level) and row[level] != "-")
+
+
+class CategoryNode:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.children = {}
+        self.ids = []
+
+    def leaf_ids(self):
+        ids = list(self.ids)
+        for child in self.children.values():
+            ids.extend(child.leaf_ids())
+        return ids
+
+    def __repr__(self):
+        return f"CategoryNode({PATH_SEP.join(self.path)!r})"
+
+
+class CategoryIndex:
+    def __init__(self, rows):
+        self.rows = {}
+        self.root = CategoryNode("", ())
+        self._nodes = []
+        for row in rows:
+            self.rows[row[ID_FIELD]] = row
+            node = self.root
+            for depth, name in enumerate(category_path(row), 1):
+                child = node.children.get(name)
+                if child is None:
+                    child = node.children[name] = CategoryNode(name, node.path + (name,))
+                    self._nodes.append(child)
+                node = child
+            node.ids.append(row[ID_FIELD])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, category_id):
+        return self.rows.get(str(category_id))
+
+    def node(self, path):
+        # `path` is a tuple of names or an "A > B > C" string.
+        if isinstance(path, str):
+            path = tuple(p.strip() for p in path.split(PATH_SEP.strip()))
+        node = self.root
+        for name in path:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def find(self, prefix, level=None):
+        prefix = prefix.casefold()
+        matches = [n for n in self._nodes if n.name.casefold().startswith(prefix) and (level is None or len(n.path) == level)]
+        return sorted(matches, key=lambda n: (len(n.path), n.path))
+
+    def subtree(self, path_or_name):
+        # Leaf ids under a full path, or under the single node with that name.
+        node = self.node(path_or_name)
+        if node is None:
+            named = [n for n in self._nodes if n.name == path_or_name]
+            if len(named) > 1:
+                raise ValueError(f"Category name '{path_or_name}' is ambiguous: {[PATH_SEP.join(n.path) for n in named]}")
+            node = named[0] if named else None
+        if node is None:
+            raise KeyError(f"Unknown category: {path_or_name}")
+        return node.leaf_ids()
+
+
+def _read_rows(csv_path):
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def load_index(csv_path=None, use_cache=True):
+    csv_path = os.path.abspath(csv_path or default_csv_path())
+    stat = os.stat(csv_path)
+    stamp = (CACHE_VERSION, stat.st_size, stat.st_mtime_ns)
+    cached = _indexes.get(csv_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    cache_path = csv_path + ".idx"
+    rows = None
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached_stamp, fields, values = pickle.load(f)
+            if cached_stamp == stamp:
+                rows = [dict(zip(fields, v)) for v in values]
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable category cache {cache_path}: {e}")
+    if rows is None:
+        rows = _read_rows(csv_path)
+        if use_cache and rows:
+            fields = list(rows[0].keys())
+            try:
+                tmp_path = cache_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump((stamp, fields, [tuple(r[k] for k in fields) for r in rows]), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logging.warning(f"Could not write category cache {cache_path}: {e}")
+
+    index = CategoryIndex(rows)
+    _indexes[csv_path] = (stamp, index)
+    return index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Look up Shopee categories by id, name prefix or subtree")
+    parser.add_argument("query", nargs="?", help="Category name prefix")
+    parser.add_argument("--id", default=None, help="Show the category with this id")
+    parser.add_argument("--subtree", default=None, help='List leaf ids under a category path ("A > B") or name')
+    parser.add_argument("--level", type=int, default=None, help="Only match names at this level (1-5)")
+    parser.add_argument("--csv", default=None, help="Category CSV (default: shopee_categories.csv)")
+    args = parser.parse_args()
+
+    index = load_index(args.csv)
+    if args.id:
+        row = index.get(args.id)
+        print(f"{args.id}: {PATH_SEP.join(category_path(row))}" if row else f"{args.id}: not found")
+    elif args.subtree:
+        print("\n".join(index.subtree(args.subtree)))
+    elif args.query:
+        for node in index.find(args.query, args.level):
+            print(f"{PATH_SEP.join(node.path)} ({len(node.leaf_ids())} ids)")
+    else:
+        parser.print_help()
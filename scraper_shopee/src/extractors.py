@@ -0,0 +1,156 @@
+import re
+import json
+import time
+
+# Declarative selector table shared by every parser. Each field is read
+# relative to its item node (or the document for single-record pages):
+#   "text"         -> rendered text (Selenium's .text / innerText)
+#   "textContent"  -> raw text including hidden nodes
+#   "count"        -> number of nodes matched
+#   "texts"        -> rendered text of every matched node
+#   anything else  -> element property / attribute of that name
+# Fields marked "optional" are legitimately empty on healthy pages (a review
+# with no seller reply or no likes), so they never count as selector misses.
+SELECTORS = {
+    "product_list": {
+        "container": '//*[@id="main"]/div/div[2]/div/div/div/div/div/div[2]/section/ul',
+        "item": './/li',
+        "fields": {
+            "link": {"xpath": './/a[@class="contents"]', "read": "href"},
+            "name": {"xpath": './/div[contains(@class, "line-clamp-2")]', "read": "textContent"},
+            "price": {"xpath": './/div[@class="truncate flex items-baseline"]', "read": "text"},
+            "rating": {"xpath": './/div[@class="text-shopee-black87 text-xs/sp14 flex-none"]', "read": "text"},
+            "img": {"xpath": './/img[@class="inset-y-0 w-full h-full pointer-events-none object-contain absolute"]', "read": "src"},
+            "location": {"xpath": './/div[@class="flex-shrink min-w-0 truncate text-shopee-black54 font-extralight text-sp10"]', "read": "text"},
+        },
+    },
+    "product_detail": {
+        "container": None,
+        "item": None,
+        "fields": {
+            "category": {"xpath": '//*[@id="sll2-normal-pdp-main"]/div/div[1]/div/div[2]/div[2]/div/div[1]/div[1]/section[1]/div', "read": "text"},
+            "description": {"xpath": '//*[@id="sll2-normal-pdp-main"]/div/div[1]/div/div[2]/div[2]/div/div[1]/div[1]/section[2]/div/div', "read": "text"},
+            "rating_filters": {"xpath": '//*[@id="sll2-normal-pdp-main"]/div/div/div/div[2]/div[3]/div/div[1]/div[2]/div/div/div[2]/div[2]//div[contains(@class,"product-rating-overview__filter")]', "read": "texts"},
+        },
+    },
+    "review": {
+        "container": '//*[contains(concat(" ", normalize-space(@class), " "), " product-ratings__list ")]',
+        "item": './/div[contains(@class,"shopee-product-rating__main")]',
+        "fields": {
+            "author": {"xpath": './/*[contains(concat(" ", normalize-space(@class), " "), " shopee-product-rating__author-name ")]', "read": "text"},
+            "rating": {"xpath": './/div[@class="shopee-product-rating__rating"]/*[contains(@class, "icon-rating-solid--active")]', "read": "count"},
+            "time": {"xpath": './/div[@class="shopee-product-rating__time"]', "read": "text"},
+            "content": {"xpath": './/div[@style="position: relative; box-sizing: border-box; margin: 15px 0px; font-size: 14px; line-height: 20px; color: rgba(0, 0, 0, 0.87); word-break: break-word; white-space: pre-wrap;"]', "read": "text"},
+            "seller_respond": {"xpath": './/div[@class="TQTPT9"]//div[@class="qiTixQ"]', "read": "text", "optional": True},
+            "like_count": {"xpath": './/div[@class="shopee-product-rating__like-count"]', "read": "text", "optional": True},
+        },
+    },
+}
+
+_EXTRACT_JS = """
+var spec = arguments[0];
+function nodes(ctx, xp) {
+    var r = document.evaluate(xp, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var out = [];
+    for (var i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+    return out;
+}
+function readNode(n, how) {
+    if (how === 'text') return n.innerText;
+    if (how === 'textContent') return n.textContent;
+    var v = n[how];
+    if (v === undefined || v === null || typeof v === 'object') v = n.getAttribute(how);
+    return v;
+}
+function readField(ctx, f) {
+    var found = nodes(ctx, f.xpath);
+    if (f.read === 'count') return found.length;
+    if (f.read === 'texts') return found.map(function (n) { return n.innerText; });
+    if (!found.length) return null;
+    return readNode(found[0], f.read);
+}
+function record(ctx) {
+    var rec = {};
+    for (var name in spec.fields) rec[name] = readField(ctx, spec.fields[name]);
+    return rec;
+}
+var root = document;
+if (spec.container) {
+    root = nodes(document, spec.container)[0];
+    if (!root) return null;
+}
+if (!spec.item) return JSON.stringify([record(root)]);
+return JSON.stringify(nodes(root, spec.item).map(record));
+"""
+
+
+def normalize_record(spec_name, raw):
+    fields = SELECTORS[spec_name]["fields"]
+    rec = {}
+    for name, field in fields.items():
+        value = raw.get(name)
+        if field["read"] == "count":
+            rec[name] = value or 0
+        elif field["read"] == "texts":
+            rec[name] = [v.strip() for v in (value or []) if v]
+        else:
+            rec[name] = value.strip() if isinstance(value, str) else ""
+    return rec
+
+
+def extract_records(driver, spec_name, timeout=0):
+    """Extract every item of `spec_name` from the page in one execute_script.
+
+    Returns None when the container is not on the page after `timeout`
+    seconds, otherwise a list of normalized records.
+    """
+    spec = SELECTORS[spec_name]
+    deadline = time.time() + timeout
+    while True:
+        payload = driver.execute_script(_EXTRACT_JS, spec)
+        if payload is not None or time.time() >= deadline:
+            break
+        time.sleep(0.25)
+    if payload is None:
+        return None
+    return [normalize_record(spec_name, raw) for raw in json.loads(payload)]
+
+
+def extract_fields(driver, spec_name, wait_for=None, timeout=0):
+    """Extract a single-record spec (e.g. a PDP), optionally polling until
+    the `wait_for` field is non-empty."""
+    deadline = time.time() + timeout
+    while True:
+        records = extract_records(driver, spec_name)
+        rec = records[0] if records else normalize_record(spec_name, {})
+        if not wait_for or rec.get(wait_for) or time.time() >= deadline:
+            return rec
+        time.sleep(0.25)
+
+
+def parse_rating_filters(texts):
+    detailed_rating = {}
+    total_ratings = 0
+    for text in texts:
+        match = re.match(r'(\d+|\D+)\s?(Sao)?\s?\((\d+)\)', text.strip())
+        if match:
+            star = match.group(1).strip().lower()
+            val = int(match.group(3))
+            if star.isdigit():
+                key = f"{star}_star"
+            else:
+                key = "all" if "tất cả" in star else re.sub(r'\s+', '_', star)
+            if key == "có_bình_luận":
+                key = "commented"
+            elif key == "có_hình_ảnh_/_video":
+                key = "media"
+            detailed_rating[key] = val
+            if star.isdigit():
+                total_ratings += val
+    return detailed_rating, total_ratings
+
+
+def finish_review(review):
+    like_text = review["like_count"]
+    review["like_count"] = int(like_text) if like_text.isdigit() else 0
+    return review
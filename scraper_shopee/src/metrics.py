@@ -0,0 +1,154 @@
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Lightweight run instrumentation: timing spans, labelled counters and gauges.
+# Spans nest per thread, so with profiling enabled their self time is also
+# folded into "a;b;c <microseconds>" stacks that flamegraph.pl and speedscope
+# read directly.
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for k, v in labels:
+        value = str(v).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{k}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metrics:
+    def __init__(self, profile=False, prefix="shopee"):
+        self.profile = profile
+        self.prefix = prefix
+        self.started = time.time()
+        self.spans = {}
+        self.counters = {}
+        self.gauges = {}
+        self._folded = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name):
+        stack = self._stack()
+        frame = [name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            path = ";".join(f[0] for f in stack + [frame]) if self.profile else None
+            self.observe(name, elapsed)
+            if path:
+                with self._lock:
+                    self._folded[path] = self._folded.get(path, 0.0) + elapsed - frame[1]
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stats = self.spans.setdefault(name, {"count": 0, "seconds": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def report(self, **extra):
+        with self._lock:
+            spans = {name: dict(s, seconds=round(s["seconds"], 4), max=round(s["max"], 4)) for name, s in self.spans.items()}
+            counters = [dict(labels, name=name, value=value) for (name, labels), value in self.counters.items()]
+            gauges = [dict(labels, name=name, value=value) for (name, labels), value in self.gauges.items()]
+        report = {
+            "started_at": self.started,
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            "spans": spans,
+            "counters": counters,
+            "gauges": gauges,
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, path, **extra):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(**extra), f, ensure_ascii=False, indent=2)
+        logging.info(f"Run metrics written to {path}")
+
+    def write_profile(self, path):
+        with self._lock:
+            folded = dict(self._folded)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(folded.items()):
+                f.write(f"{stack} {int(seconds * 1e6)}\n")
+        logging.info(f"Profile trace ({len(folded)} stacks) written to {path}")
+
+    def prometheus_text(self):
+        p = self.prefix
+        lines = [
+            f"# TYPE {p}_span_seconds_total counter",
+            f"# TYPE {p}_span_count_total counter",
+            f"# TYPE {p}_span_seconds_max gauge",
+        ]
+        with self._lock:
+            for name, s in sorted(self.spans.items()):
+                labels = _prom_labels([("span", name)])
+                lines.append(f"{p}_span_seconds_total{labels} {s['seconds']:.6f}")
+                lines.append(f"{p}_span_count_total{labels} {s['count']}")
+                lines.append(f"{p}_span_seconds_max{labels} {s['max']:.6f}")
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{p}_{name}_total{_prom_labels(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{p}_{name}{_prom_labels(labels)} {value}")
+        lines.append(f"{p}_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return self._server
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
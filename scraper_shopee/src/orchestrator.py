@@ -0,0 +1,268 @@
+import re
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+import itertools
+from pacing import Pacer
+from retriv_data import ProductScraper
+from sessions import SessionPool
+from category_index import load_index
+from captcha import CaptchaHandler, CaptchaBlocked, make_notifier
+
+# Runs a batch of keyword/category/sort jobs over a fixed pool of long-lived
+# browser sessions. Job progress is persisted after every state change so an
+# interrupted batch resumes exactly where it stopped.
+
+JOB_DEFAULTS = {
+    "num": 10,
+    "review_limit": 30,
+    "index_only": False,
+    "all_star_types": False,
+    "star_limit_per_type": 10,
+    "sort_by": "relevancy",
+    "category": None,
+    "time_range": None,
+    "priority": 0,
+    "store": None,
+    "category_tree": None,
+}
+EXPANDABLE = ("keyword", "category", "sort_by", "time_range")
+
+
+def expand_jobs(spec):
+    # A job entry may list several keywords/categories/sorts; every combination becomes one job.
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    defaults = dict(JOB_DEFAULTS, **spec.get("defaults", {}))
+    jobs = []
+    for entry in spec.get("jobs", []):
+        entry = dict(defaults, **entry)
+        trees = entry.pop("category_tree")
+        if trees:
+            # A category name or path ("A > B") expands into every leaf category id below it.
+            index = load_index()
+            entry["category"] = [cid for tree in (trees if isinstance(trees, list) else [trees]) for cid in index.subtree(tree)]
+        choices = [entry[k] if isinstance(entry[k], list) else [entry[k]] for k in EXPANDABLE]
+        for combo in itertools.product(*choices):
+            params = dict(entry, **dict(zip(EXPANDABLE, combo)))
+            if params["category"] is not None:
+                params["category"] = str(params["category"])
+            jobs.append({"id": job_id(params), "params": params})
+    return jobs
+
+
+def job_id(params):
+    identity = {k: v for k, v in params.items() if k != "priority"}
+    return hashlib.sha1(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def job_output_file(params):
+    name = "shopee_" + re.sub(r'[^a-z0-9_]+', '', params["keyword"].lower())
+    if params["category"]:
+        name += f"_c{params['category']}"
+    if params["sort_by"] != "relevancy":
+        name += f"_{params['sort_by']}"
+    if params["time_range"]:
+        name += f"_{params['time_range']}"
+    return name + ".json"
+
+
+class JobState:
+    def __init__(self, path):
+        self.path = path
+        self.jobs = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.jobs = json.load(f).get("jobs", {})
+
+    def sync(self, jobs):
+        for job in jobs:
+            entry = self.jobs.setdefault(job["id"], {"status": "pending", "attempts": 0})
+            entry["params"] = job["params"]
+            if entry["status"] == "running":
+                # The previous batch stopped mid-job; run it again.
+                entry["status"] = "pending"
+        self.save()
+
+    def runnable(self, max_attempts):
+        for jid, entry in self.jobs.items():
+            # Failed jobs come back when a later batch raises --max-attempts; within
+            # one batch a failure below the limit is requeued as "pending" instead.
+            if entry["status"] == "pending" or (entry["status"] == "failed" and entry["attempts"] < max_attempts):
+                yield {"id": jid, "params": entry["params"]}
+
+    def mark(self, jid, **fields):
+        self.jobs[jid].update(fields, updated_at=time.time())
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": self.jobs}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class Orchestrator:
+    def __init__(self, state, sessions=2, max_attempts=3, backoff=30.0, pacer=None, api_capture=False, session_pool=None, captcha=None):
+        self.state = state
+        self.sessions = sessions
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.pacer = pacer or Pacer()
+        self.api_capture = api_capture
+        self.session_pool = session_pool or SessionPool(size=sessions, enable_cdp_events=api_capture)
+        self.captcha = captcha or CaptchaHandler()
+        # The event loop only keeps weak references to tasks; pending retries must not be collected.
+        self._tasks = set()
+
+    def _run_job(self, driver, job):
+        params = job["params"]
+        scraper = ProductScraper(
+            params["keyword"],
+            params["num"],
+            params["index_only"],
+            params["review_limit"],
+            all_star_types=params["all_star_types"],
+            star_limit_per_type=params["star_limit_per_type"],
+            sort_by=params["sort_by"],
+            category=params["category"],
+            time_range=params["time_range"],
+            api_capture=self.api_capture,
+            store_path=params["store"],
+            pacer=self.pacer,
+            output_file=job_output_file(params),
+            session_pool=self.session_pool,
+            captcha=self.captcha,
+            captcha_handoff=True
+        )
+        scraper.run(driver)
+        return scraper.sink.count
+
+    async def _in_thread(self, func, *args):
+        # WebDriver calls block, so they run in the default executor (asyncio.to_thread needs 3.9).
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _retry_later(self, queue, item, delay):
+        await asyncio.sleep(delay)
+        await queue.put(item)
+        # The failed attempt's task_done is deferred until the retry is queued,
+        # so queue.join() cannot finish while a retry is still pending.
+        queue.task_done()
+
+    async def _session_worker(self, index, queue):
+        name = f"worker-{index + 1}"
+        while True:
+            item = await queue.get()
+            job = item[2]
+            jid = job["id"]
+            attempts = self.state.jobs[jid]["attempts"] + 1
+            self.state.mark(jid, status="running", attempts=attempts, session=name)
+            logging.info(f"[{name}] Job {jid} attempt {attempts}: {job['params']['keyword']} "
+                         f"(category={job['params']['category']}, sort={job['params']['sort_by']})")
+            session = None
+            try:
+                session = await self._in_thread(self.session_pool.lease)
+                products = await self._in_thread(self._run_job, session.driver, job)
+            except CaptchaBlocked as e:
+                # Not the job's fault: it goes straight back for another session, without using
+                # up an attempt, while this session stays parked until the captcha is solved.
+                logging.warning(f"[{name}] Job {jid} blocked by a captcha, handing it back to the queue")
+                self.state.mark(jid, status="pending", attempts=attempts - 1, last_error=str(e))
+                await queue.put(item)
+                queue.task_done()
+                cleared = await self._in_thread(self.captcha.park, session.driver, name)
+                await self._in_thread(self.session_pool.release, session, not cleared)
+                continue
+            except Exception as e:
+                logging.warning(f"[{name}] Job {jid} failed: {e}")
+                if session is not None:
+                    # A dead browser is replaced before the next job leases it.
+                    alive = await self._in_thread(self.session_pool.healthy, session)
+                    await self._in_thread(self.session_pool.release, session, not alive)
+                if attempts < self.max_attempts:
+                    delay = self.backoff * 2 ** (attempts - 1)
+                    self.state.mark(jid, status="pending", last_error=str(e), retry_after=time.time() + delay)
+                    task = asyncio.create_task(self._retry_later(queue, item, delay))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                else:
+                    self.state.mark(jid, status="failed", last_error=str(e))
+                    queue.task_done()
+                continue
+            await self._in_thread(self.session_pool.release, session)
+            self.state.mark(jid, status="done", products=products, output=job_output_file(job["params"]))
+            queue.task_done()
+
+    async def run(self):
+        queue = asyncio.PriorityQueue()
+        order = itertools.count()
+        for job in self.state.runnable(self.max_attempts):
+            # Higher priority first, then job-file order.
+            queue.put_nowait((-job["params"]["priority"], next(order), job))
+        if queue.empty():
+            logging.info("No pending jobs.")
+            return
+        logging.info(f"Running {queue.qsize()} jobs on {self.sessions} browser sessions")
+        workers = [asyncio.create_task(self._session_worker(i, queue)) for i in range(min(self.sessions, queue.qsize()))]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await self._in_thread(self.session_pool.close)
+        statuses = [entry["status"] for entry in self.state.jobs.values()]
+        logging.info(f"Batch finished: {statuses.count('done')} done, {statuses.count('failed')} failed")
+        logging.info(f"Captchas: {json.dumps(self.captcha.summary())}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Run a batch of Shopee scrape jobs over a pool of browser sessions")
+    parser.add_argument("job_file", help="JSON job file")
+    parser.add_argument("-s", "--sessions", type=int, default=2, help="Number of long-lived browser sessions")
+    parser.add_argument("--state", default=None, help="Job state file (default: <job_file>.state.json)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per job before it is marked failed")
+    parser.add_argument("--backoff", type=float, default=30.0, help="Initial retry delay in seconds, doubled per attempt")
+    parser.add_argument("--global-rate", type=float, default=None, help="Max page loads per second across all sessions")
+    parser.add_argument("--domain-rate", type=float, default=None, help="Max page loads per second per domain")
+    parser.add_argument("--user-data-dir", default=None, help="Keep one persistent Chrome profile per session under this directory")
+    parser.add_argument("--lite", action="store_true", default=False, help="Run Chrome headless with a small window and without images, fonts, media or trackers")
+    parser.add_argument("--chrome-version", type=int, default=None, help="Major version of the installed Chrome (default: detect automatically)")
+    parser.add_argument("--max-pages-per-session", type=int, default=300, help="Restart a browser after this many page loads")
+    parser.add_argument("--max-browser-mb", type=int, default=1536, help="Restart a browser once its processes use more than this much memory (RSS)")
+    parser.add_argument("--api-capture", action="store_true", default=False, help="Read Shopee's JSON API responses via CDP")
+    parser.add_argument("--captcha-notify", action="append", type=make_notifier, default=[], metavar="cli|file:PATH|webhook:URL", help="Where to announce parked and cleared captchas (default: cli); repeatable")
+    parser.add_argument("--captcha-timeout", type=float, default=None, help="Restart a session whose captcha is not solved within this many seconds (default: wait until solved)")
+    args = parser.parse_args()
+
+    with open(args.job_file, "r", encoding="utf-8") as f:
+        jobs = expand_jobs(json.load(f))
+    state = JobState(args.state or args.job_file + ".state.json")
+    state.sync(jobs)
+    orchestrator = Orchestrator(
+        state,
+        sessions=args.sessions,
+        max_attempts=args.max_attempts,
+        backoff=args.backoff,
+        pacer=Pacer(global_rate=args.global_rate, domain_rate=args.domain_rate),
+        api_capture=args.api_capture,
+        session_pool=SessionPool(
+            size=args.sessions,
+            profile_root=args.user_data_dir,
+            version_main=args.chrome_version,
+            enable_cdp_events=args.api_capture,
+            max_pages=args.max_pages_per_session,
+            max_memory_mb=args.max_browser_mb,
+            lite=args.lite
+        ),
+        captcha=CaptchaHandler(args.captcha_notify, timeout=args.captcha_timeout)
+    )
+    asyncio.run(orchestrator.run())
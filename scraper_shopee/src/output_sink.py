@@ -0,0 +1,106 @@
+import os
+import json
+import logging
+import textwrap
+import threading
+
+def write_json_array(path, records):
+    # Streams records into the same layout as json.dump(list, indent=2),
+    # through a temp file so readers never see a half-written export.
+    tmp_path = path + ".tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if written else "\n")
+            f.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=2), "  "))
+            written += 1
+        f.write("\n]" if written else "]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return written
+
+
+# Append-only JSONL output: one finished product per line, fsync'd in batches.
+# A crash can at worst lose the unsynced tail or leave one truncated last line,
+# which iter_records skips. compact() exports the classic pretty JSON array.
+
+
+class JsonlSink:
+    def __init__(self, path, fsync_every=5):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._file = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+    def iter_records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logging.warning(f"Skipping unreadable line {line_no} in {self.path}")
+
+    def import_json(self, json_path):
+        # One-off migration of an output file written before the JSONL format.
+        with open(json_path, "r", encoding="utf-8") as f:
+            products = json.load(f)
+        for prod in products:
+            self.append(prod)
+        self.sync()
+        self.count = 0
+        return len(products)
+
+    def append(self, product):
+        line = json.dumps(product, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._file.tell() and not self._ends_with_newline():
+                    # Terminate a line left truncated by an earlier crash.
+                    self._file.write("\n")
+            self._file.write(line)
+            self.count += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync_locked()
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _sync_locked(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def close(self):
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def compact(self, json_path):
+        # Two streaming passes: find the last line for every link, then write
+        # those records in order. Only the link index is held in memory.
+        last_seen = {}
+        for idx, prod in enumerate(self.iter_records()):
+            last_seen[prod.get("link") or f"#{idx}"] = idx
+        keep = set(last_seen.values())
+        records = (prod for idx, prod in enumerate(self.iter_records()) if idx in keep)
+        return write_json_array(json_path, records)
@@ -0,0 +1,156 @@
+import time
+import random
+import threading
+from urllib.parse import urlparse
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Central wait/pacing policy. Explicit WebDriverWait conditions replace fixed
+# sleeps for DOM readiness, and politeness delays between requests scale with
+# an adaptive factor that backs off on captcha/block signals and slowly
+# recovers while pages keep loading cleanly.
+
+DEFAULT_DELAYS = {
+    "search_page": (3.0, 7.0),
+    "product_page": (0.5, 1.5),
+    "review_page": (0.2, 0.6),
+    "star_filter": (0.2, 0.6),
+}
+DEFAULT_TIMEOUTS = {
+    "page_ready": 10,
+    "search_page": 8,
+    "review_list": 5,
+    "review_page": 5,
+    "star_filter": 5,
+    "captcha": 10,
+}
+
+_REVIEW_FINGERPRINT_JS = """
+var list = document.querySelector('.product-ratings__list');
+if (!list) return null;
+var active = document.querySelector('.shopee-page-controller .shopee-button-solid--primary');
+var first = list.querySelector('.shopee-product-rating__main');
+return [active ? active.textContent : '', list.childElementCount, first ? first.textContent.slice(0, 200) : ''].join('|');
+"""
+
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def review_fingerprint(driver):
+    try:
+        return driver.execute_script(_REVIEW_FINGERPRINT_JS)
+    except WebDriverException:
+        return None
+
+
+def review_list_changed(before):
+    def condition(driver):
+        after = review_fingerprint(driver)
+        return after is not None and after != before
+    return condition
+
+
+def parse_pace(spec):
+    # "phase=min:max", e.g. "search_page=2:4"
+    phase, _, bounds = spec.partition("=")
+    low, _, high = bounds.partition(":")
+    return phase.strip(), (float(low), float(high or low))
+
+
+class RateLimiter:
+    # Thread-safe token bucket: `rate` requests per second with bursts of `burst`.
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                needed = (1 - self.tokens) / self.rate
+            time.sleep(needed)
+            waited += needed
+
+
+class Pacer:
+    def __init__(self, delays=None, timeouts=None, adaptive=True, min_factor=0.5, max_factor=8.0, global_rate=None, domain_rate=None):
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.adaptive = adaptive
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.factor = 1.0
+        self.stats = {}
+        self._lock = threading.Lock()
+        self.global_limiter = RateLimiter(global_rate) if global_rate else None
+        self.domain_rate = domain_rate
+        self._domain_limiters = {}
+
+    def _record(self, phase, key, value=1):
+        with self._lock:
+            phase_stats = self.stats.setdefault(phase, {})
+            phase_stats[key] = phase_stats.get(key, 0) + value
+
+    def delay(self, phase):
+        low, high = self.delays.get(phase, (0.0, 0.0))
+        seconds = random.uniform(low, high) * self.factor
+        if seconds > 0:
+            time.sleep(seconds)
+        self._record(phase, "delays")
+        self._record(phase, "delay_seconds", seconds)
+        return seconds
+
+    def before_request(self, url):
+        # Shared by every session using this pacer, so limits hold across jobs.
+        waited = 0.0
+        if self.global_limiter:
+            waited += self.global_limiter.acquire()
+        if self.domain_rate:
+            domain = urlparse(url).hostname or ""
+            with self._lock:
+                limiter = self._domain_limiters.setdefault(domain, RateLimiter(self.domain_rate))
+            waited += limiter.acquire()
+        if waited:
+            self._record("rate_limit", "wait_seconds", waited)
+        return waited
+
+    def wait(self, driver, condition, phase, timeout=None):
+        timeout = self.timeouts.get(phase, 10) if timeout is None else timeout
+        start = time.time()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=0.1).until(condition)
+        except TimeoutException:
+            result = None
+            self._record(phase, "timeouts")
+        self._record(phase, "waits")
+        self._record(phase, "wait_seconds", time.time() - start)
+        return result
+
+    def on_block(self):
+        with self._lock:
+            if self.adaptive:
+                self.factor = min(self.max_factor, self.factor * 2)
+            factor = self.factor
+        self._record("adaptive", "blocks")
+        return factor
+
+    def on_success(self):
+        if not self.adaptive:
+            return
+        with self._lock:
+            self.factor = max(self.min_factor, self.factor * 0.95)
+
+    def summary(self):
+        with self._lock:
+            return {"factor": round(self.factor, 3), "phases": {p: dict(s) for p, s in self.stats.items()}}
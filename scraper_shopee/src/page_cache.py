@@ -0,0 +1,195 @@
+import os
+import sys
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from product_store import parse_item_ids
+
+# Local cache of product pages and review list pages for repeat crawls. An
+# entry is keyed by the normalized URL plus the page state (star filter,
+# review page), points at a gzip'd body stored once per content hash, expires
+# after a per-kind TTL, and the least recently used entries are evicted once
+# the bodies outgrow the size limit.
+
+CACHE_MODES = ("off", "read-through", "offline-only")
+DEFAULT_TTLS = {
+    "pdp": 24 * 3600,
+    "review": 6 * 3600,
+}
+TRACKING_PARAMS = ("sp_atk", "xptdk", "uls_trackid", "publish_id", "is_from_login")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_pages_digest ON pages (digest);
+
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def normalize_url(url):
+    # Product links carry per-impression tracking; shop/item ids identify the page.
+    shopid, itemid = parse_item_ids(url)
+    if shopid is not None:
+        return f"item:{shopid}.{itemid}"
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in TRACKING_PARAMS and not k.startswith("utm_"))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def parse_ttl(text):
+    """"review=3600" -> ("review", 3600.0) for argparse."""
+    try:
+        kind, seconds = text.split("=", 1)
+        return kind.strip(), float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected KIND=SECONDS, got '{text}'")
+
+
+class PageCache:
+    def __init__(self, root, mode="read-through", ttls=None, max_bytes=512 * 1024 * 1024):
+        if mode not in CACHE_MODES[1:]:
+            raise ValueError(f"Unknown cache mode '{mode}'")
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.mode = mode
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "pages.db"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    @property
+    def offline(self):
+        return self.mode == "offline-only"
+
+    def _key(self, kind, url, state):
+        state_text = json.dumps(state, sort_keys=True)
+        key = hashlib.sha1(f"{kind}\x1f{normalize_url(url)}\x1f{state_text}".encode("utf-8")).hexdigest()
+        return key, state_text
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, kind, url, **state):
+        """Body of a fresh entry, or None. Offline mode also serves expired entries."""
+        key, _ = self._key(kind, url, state)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.stored_at, b.data FROM pages p JOIN bodies b ON b.digest = p.digest WHERE p.key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        stored_at, data = row
+        if time.time() - stored_at > self.ttls.get(kind, 0) and not self.offline:
+            self._count("stale")
+            return None
+        with self._lock:
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        self._count("hits")
+        return gzip.decompress(data).decode("utf-8")
+
+    def put(self, kind, url, body, **state):
+        if body is None or self.offline:
+            return
+        key, state_text = self._key(kind, url, state)
+        raw = body.encode("utf-8")
+        digest = hashlib.sha1(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM bodies WHERE digest = ?", (digest,)).fetchone() is None:
+                data = gzip.compress(raw, compresslevel=6)
+                self._conn.execute("INSERT INTO bodies (digest, data, size) VALUES (?, ?, ?)", (digest, data, len(data)))
+                self._size += len(data)
+            old = self._conn.execute("SELECT digest FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, kind, url, state, digest, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, url, state_text, digest, now, now),
+            )
+            if old and old[0] != digest:
+                self._drop_orphan(old[0])
+            if self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+            self.stats["stores"] += 1
+
+    def _drop_orphan(self, digest):
+        if self._conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            row = self._conn.execute("SELECT size FROM bodies WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM bodies WHERE digest = ?", (digest,))
+                self._size -= row[0]
+
+    def _evict(self):
+        # Least recently used first, down to 90% of the limit so every store does not evict again.
+        target = self.max_bytes * 0.9
+        for key, digest in self._conn.execute("SELECT key, digest FROM pages ORDER BY accessed_at").fetchall():
+            if self._size <= target:
+                break
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._drop_orphan(digest)
+            self.stats["evictions"] += 1
+
+    def purge_expired(self):
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key, kind, digest, stored_at in self._conn.execute("SELECT key, kind, digest, stored_at FROM pages").fetchall():
+                if now - stored_at > self.ttls.get(kind, 0):
+                    self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                    self._drop_orphan(digest)
+                    removed += 1
+            self._conn.commit()
+        return removed
+
+    def summary(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return dict(self.stats, entries=entries, size_mb=round(self._size / 1024 / 1024, 2))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Inspect or trim the page cache")
+    parser.add_argument("--cache-dir", default=".shopee_cache", help="Cache directory")
+    parser.add_argument("--cache-ttl", action="append", type=parse_ttl, default=[], metavar="KIND=SECONDS", help="TTL for pdp or review pages; repeatable")
+    parser.add_argument("--purge", action="store_true", default=False, help="Delete expired entries")
+    args = parser.parse_args()
+    cache = PageCache(args.cache_dir, ttls=dict(args.cache_ttl))
+    if args.purge:
+        logging.info(f"Removed {cache.purge_expired()} expired entries")
+    logging.info(f"Cache {args.cache_dir}: {json.dumps(cache.summary())}")
+    cache.close()
@@ -0,0 +1,256 @@
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime
+from output_sink import write_json_array
+
+# SQLite-backed store for scraped products and reviews. It can stand in for
+# JsonlSink (append/sync/close/compact) and answers "already scraped?" with an
+# indexed lookup, so start-up cost does not grow with the number of products.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    keyword TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    shopid INTEGER,
+    itemid INTEGER,
+    link TEXT,
+    data TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (keyword, product_key)
+);
+CREATE INDEX IF NOT EXISTS idx_products_item ON products (shopid, itemid);
+CREATE INDEX IF NOT EXISTS idx_products_keyword_time ON products (keyword, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_products_updated ON products (updated_at);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    product_key TEXT NOT NULL,
+    review_key TEXT NOT NULL,
+    shopid INTEGER,
+    itemid INTEGER,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (product_key, review_key)
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_item ON reviews (shopid, itemid);
+CREATE INDEX IF NOT EXISTS idx_reviews_time ON reviews (scraped_at);
+"""
+
+REVIEW_TIME = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+ITEM_ID_PATTERNS = [re.compile(r"-i\.(\d+)\.(\d+)"), re.compile(r"/product/(\d+)/(\d+)")]
+
+
+def parse_item_ids(link):
+    for pattern in ITEM_ID_PATTERNS:
+        match = pattern.search(link or "")
+        if match:
+            return int(match.group(1)), int(match.group(2))
+    return None, None
+
+
+def product_key(link):
+    # Search links carry per-impression tracking parameters, so identify a
+    # product by shop/item id whenever the link has them.
+    shopid, itemid = parse_item_ids(link)
+    if shopid is not None:
+        return f"{shopid}.{itemid}"
+    return link or ""
+
+
+def review_key(review):
+    if review.get("cmtid") is not None:
+        return str(review["cmtid"])
+    raw = "\x1f".join(str(review.get(k, "")) for k in ("author", "time", "content"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def review_timestamp(review):
+    """Epoch seconds of a review: the API's ctime, else the "YYYY-MM-DD HH:MM" in
+    its time text. None when neither is there."""
+    if review.get("ctime"):
+        return float(review["ctime"])
+    match = REVIEW_TIME.search(str(review.get("time") or ""))
+    if match is None:
+        return None
+    return datetime.strptime(match.group(0), "%Y-%m-%d %H:%M").timestamp()
+
+
+def _content_hash(record):
+    canonical = json.dumps(record, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class StoredLinks:
+    # Set-like view over the store used as ProductScraper.scraped_links.
+    def __init__(self, store):
+        self.store = store
+
+    def __contains__(self, link):
+        return self.store.has_product(link)
+
+    def __len__(self):
+        return self.store.product_count()
+
+    def add(self, link):
+        # Products become visible once they are appended to the store.
+        pass
+
+
+class ProductStore:
+    def __init__(self, path, keyword=None):
+        self.path = path
+        self.keyword = keyword
+        self.count = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def links(self):
+        return StoredLinks(self)
+
+    def has_product(self, link, keyword=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM products WHERE keyword = ? AND product_key = ?",
+                (keyword or self.keyword, product_key(link))
+            ).fetchone()
+        return row is not None
+
+    def product_count(self, keyword=None):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM products WHERE keyword = ?", (keyword or self.keyword,)).fetchone()[0]
+
+    def upsert_product(self, product, keyword=None):
+        keyword = keyword or self.keyword
+        key = product_key(product.get("link"))
+        shopid, itemid = parse_item_ids(product.get("link"))
+        body = {k: v for k, v in product.items() if k != "comments"}
+        data = json.dumps(body, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            # Rows whose content is unchanged are left untouched.
+            self._conn.execute(
+                """INSERT INTO products (keyword, product_key, shopid, itemid, link, data, content_hash, scraped_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (keyword, product_key) DO UPDATE SET
+                       link = excluded.link, data = excluded.data,
+                       content_hash = excluded.content_hash, updated_at = excluded.updated_at
+                   WHERE products.content_hash != excluded.content_hash""",
+                (keyword, key, shopid, itemid, product.get("link"), data, _content_hash(body), now, now)
+            )
+            if "comments" in product:
+                self._upsert_reviews_locked(key, shopid, itemid, product["comments"], now)
+        return key
+
+    def _upsert_reviews_locked(self, key, shopid, itemid, reviews, now):
+        row = self._conn.execute("SELECT COALESCE(MAX(position), -1) FROM reviews WHERE product_key = ?", (key,)).fetchone()
+        next_position = row[0] + 1
+        for review in reviews:
+            rkey = review_key(review)
+            data = json.dumps(review, ensure_ascii=False)
+            digest = _content_hash(review)
+            exists = self._conn.execute(
+                "SELECT 1 FROM reviews WHERE product_key = ? AND review_key = ?", (key, rkey)
+            ).fetchone()
+            if exists:
+                self._conn.execute(
+                    """UPDATE reviews SET data = ?, content_hash = ?, updated_at = ?
+                       WHERE product_key = ? AND review_key = ? AND content_hash != ?""",
+                    (data, digest, now, key, rkey, digest)
+                )
+                continue
+            self._conn.execute(
+                """INSERT INTO reviews (product_key, review_key, shopid, itemid, position, data, content_hash, scraped_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, rkey, shopid, itemid, next_position, data, digest, now, now)
+            )
+            next_position += 1
+
+    def upsert_reviews(self, link, reviews):
+        key = product_key(link)
+        shopid, itemid = parse_item_ids(link)
+        with self._lock:
+            self._upsert_reviews_locked(key, shopid, itemid, reviews, time.time())
+
+    def review_keys(self, link):
+        with self._lock:
+            rows = self._conn.execute("SELECT review_key FROM reviews WHERE product_key = ?", (product_key(link),)).fetchall()
+        return {r[0] for r in rows}
+
+    def newest_review_time(self, link):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM reviews WHERE product_key = ?", (product_key(link),)).fetchall()
+        times = [t for t in (review_timestamp(json.loads(r[0])) for r in rows) if t is not None]
+        return max(times, default=None)
+
+    def iter_products(self, keyword=None, with_reviews=True, batch_size=500, with_times=False):
+        # with_times adds each row's first-seen epoch as "scraped_at" to products and reviews.
+        keyword = keyword or self.keyword
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, product_key, data, scraped_at FROM products WHERE keyword = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (keyword, last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for last_rowid, key, data, scraped_at in rows:
+                product = json.loads(data)
+                if with_times:
+                    product["scraped_at"] = scraped_at
+                if with_reviews and "detailed_rating" in product:
+                    with self._lock:
+                        reviews = self._conn.execute(
+                            "SELECT data, scraped_at FROM reviews WHERE product_key = ? ORDER BY position", (key,)
+                        ).fetchall()
+                    product["comments"] = [dict(json.loads(r[0]), scraped_at=r[1]) if with_times else json.loads(r[0]) for r in reviews]
+                yield product
+
+    def export_json(self, json_path, keyword=None):
+        return write_json_array(json_path, self.iter_products(keyword))
+
+    # JsonlSink-compatible interface used by ProductScraper.
+
+    def append(self, product):
+        self.upsert_product(product)
+        self.count += 1
+
+    def sync(self):
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        self.sync()
+
+    def compact(self, json_path):
+        return self.export_json(json_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Export products for a keyword from the SQLite store")
+    parser.add_argument("db", help="SQLite store written with --store")
+    parser.add_argument("-k", "--keyword", required=True, help="Keyword the products were scraped for")
+    parser.add_argument("-o", "--output", required=True, help="Output JSON file")
+    args = parser.parse_args()
+    store = ProductStore(args.db, args.keyword)
+    total = store.export_json(args.output)
+    logging.info(f"Exported {total} products for '{args.keyword}' to {args.output}")
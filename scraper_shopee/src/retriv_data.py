@@ -1,17 +1,34 @@
 import sys
-import time
 import json
 import logging
 import argparse
 import re
 import os
-import undetected_chromedriver as uc
+import queue
+import threading
+import itertools
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
 from tqdm import tqdm
+from extractors import SELECTORS, extract_records, extract_fields, parse_rating_filters, finish_review
+from snapshots import SnapshotWriter
+from output_sink import JsonlSink
+from product_store import ProductStore, review_key
+from pacing import Pacer, parse_pace, document_ready, review_fingerprint, review_list_changed
+from api_capture import ApiCapture, HarRecorder, parse_search_items, parse_item, parse_ratings
+from metrics import Metrics
+from sessions import SessionPool, create_chrome
+from review_pager import ReviewPager, REVIEWS_PER_PAGE
+from category_index import load_index
+from captcha import CaptchaHandler, CaptchaBlocked, is_blocked, make_notifier
+from page_cache import PageCache, CACHE_MODES, parse_ttl
+from snapshot_parser import parse_html
+
+REVIEW_LIST_JS = "var l = document.querySelector('.product-ratings__list'); return l ? l.outerHTML : null;"
 
 class ProductScraper:
-    def __init__(self, keyword, num_products, index_only, review_limit, all_star_types=False, star_limit_per_type=10, sort_by="relevancy", category=None, time_range=None):
+    def __init__(self, keyword, num_products, index_only, review_limit, all_star_types=False, star_limit_per_type=10, sort_by="relevancy", category=None, time_range=None, workers=1, fast_extract=True, capture_dir=None, api_capture=False, record_har=None, store_path=None, pacer=None, output_file=None, metrics=None, profile_path=None, session_pool=None, base_url="https://shopee.ph", captcha=None, captcha_handoff=False, cache=None):
         self.keyword = keyword
         self.num_products = num_products
         self.index_only = index_only
@@ -21,22 +38,36 @@ class ProductScraper:
         self.sort_by = sort_by
         self.category = category
         self.time_range = time_range
-        self.output_file = f"shopee_{re.sub(r'[^a-z0-9_]+', '', self.keyword.lower())}.json"
+        self.workers = max(1, workers)
+        self.fast_extract = fast_extract
+        self.har_recorder = HarRecorder(record_har) if record_har else None
+        self.api_capture = api_capture or self.har_recorder is not None
+        self.pacer = pacer or Pacer()
+        self.metrics = metrics or Metrics(profile=bool(profile_path))
+        self.profile_path = profile_path
+        self.session_pool = session_pool
+        self.base_url = base_url.rstrip("/")
+        self.captcha = captcha or CaptchaHandler(metrics=self.metrics)
+        # With handoff, a captcha ends the run so the caller can give the work to another session.
+        self.captcha_handoff = captcha_handoff
+        self.cache = cache
+        self.output_file = output_file or f"shopee_{re.sub(r'[^a-z0-9_]+', '', self.keyword.lower())}.json"
+        self.sink = ProductStore(store_path, self.keyword) if store_path else JsonlSink(self.output_file + "l")
         self.scraped_links = set()
+        self.snapshots = SnapshotWriter(capture_dir) if capture_dir else None
         self._setup_logging()
-        self._load_existing_data()
+        if self.snapshots:
+            self.scraped_links = self.snapshots.captured_links()
+        else:
+            self._load_existing_data()
         self.category_info = None
         if self.category:
             try:
-                import csv
-                with open("shopee_categories.csv", "r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get("ma_nganh") == self.category:
-                            self.category_info = row
-                            break
-            except:
-                self.category_info = None
+                self.category_info = load_index().get(self.category)
+                if self.category_info is None:
+                    logging.warning(f"Category {self.category} is not in the category index")
+            except OSError as e:
+                logging.warning(f"Could not load the category index: {e}")
 
     def _setup_logging(self):
         logging.basicConfig(
@@ -46,28 +77,53 @@ class ProductScraper:
         )
 
     def _load_existing_data(self):
-        self.existing_products = []
-        if os.path.exists(self.output_file):
-            try:
-                with open(self.output_file, 'r', encoding='utf-8') as f:
-                    self.existing_products = json.load(f)
-                self.scraped_links = {prod.get('link', '') for prod in self.existing_products if prod.get('link')}
-                logging.info(f"Loaded {len(self.existing_products)} existing products from {self.output_file}")
+        if isinstance(self.sink, ProductStore):
+            # Lookups go straight to the store's index instead of loading every link.
+            self.scraped_links = self.sink.links()
+            logging.info(f"Resume mode: skipping products already in {self.sink.path}")
+            return
+        try:
+            if not os.path.exists(self.sink.path) and os.path.exists(self.output_file):
+                imported = self.sink.import_json(self.output_file)
+                logging.info(f"Imported {imported} products from {self.output_file} into {self.sink.path}")
+            existing = 0
+            for prod in self.sink.iter_records():
+                existing += 1
+                if prod.get('link'):
+                    self.scraped_links.add(prod['link'])
+            if existing:
+                logging.info(f"Loaded {existing} existing products from {self.sink.path}")
                 logging.info(f"Resume mode: Will skip {len(self.scraped_links)} already scraped products")
-            except Exception as e:
-                logging.warning(f"Could not load existing data: {e}")
-                self.existing_products = []
+        except Exception as e:
+            logging.warning(f"Could not load existing data: {e}")
 
-    def _periodic_save(self, products):
+    def _periodic_save(self):
+        if self.snapshots:
+            # Capture-only runs produce their output through snapshot_parser.py.
+            return
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(products, f, ensure_ascii=False, indent=2)
-            logging.info(f"Periodic save: {len(products)} products saved to {self.output_file}")
+            with self.metrics.span("periodic_save"):
+                self.sink.sync()
+            logging.info(f"Periodic save: {self.sink.count} new products appended to {self.sink.path}")
         except Exception as e:
             logging.warning(f"Periodic save failed: {e}")
 
+    def _close_sink(self):
+        try:
+            self.sink.close()
+        except Exception as e:
+            logging.warning(f"Could not close {self.sink.path}: {e}")
+
+    def _export(self):
+        try:
+            self.sink.close()
+            total = self.sink.compact(self.output_file)
+            logging.info(f"Completed! Total {total} products saved to {self.output_file}")
+        except Exception as e:
+            logging.warning(f"Export to {self.output_file} failed: {e}")
+
     def _build_search_url(self):
-        base_url = "https://shopee.ph/search?"
+        base_url = f"{self.base_url}/search?"
         params = []
         if self.category:
             params.append(f"facet={self.category}")
@@ -80,87 +136,161 @@ class ProductScraper:
         else:
             params.append(f"sortBy={self.sort_by}")
         return base_url + "&".join(params)
-    def _wait_for_captcha(self, driver):
-        blacklist = ["captcha", "/buyer/login", "/user/login", "/account/login", "/verify", "security"]
-        while any(x in driver.current_url.lower() for x in blacklist):
-            logging.info("Captcha or login detected. Please solve it and press Enter.")
-            input()
-            time.sleep(5)
+    def _wait_for_captcha(self, driver, worker_name=None):
+        if not is_blocked(driver.current_url):
+            self.pacer.on_success()
+            self.metrics.set_gauge("pacer_factor", self.pacer.factor)
+            return
+        self.metrics.set_gauge("pacer_factor", self.pacer.on_block())
+        self.metrics.incr("captcha", worker=worker_name or "main")
+        # Parallel workers hand their product back to the queue before parking.
+        if worker_name or self.captcha_handoff:
+            raise CaptchaBlocked(driver.current_url, worker_name)
+        self._park(driver, worker_name)
+
+    def _park(self, driver, worker_name=None):
+        if not self.captcha.park(driver, worker_name or "main"):
+            raise CaptchaBlocked(driver.current_url, worker_name)
+        self.pacer.wait(driver, document_ready, "captcha")
+
+    def _load(self, driver, url):
+        self.pacer.before_request(url)
+        with self.metrics.span("driver.get"):
+            driver.get(url)
+
+    def _count_misses(self, spec_name, records):
+        # Empty required fields are where a selector no longer matches the live markup.
+        fields = SELECTORS[spec_name]["fields"]
+        counted = {name for name, f in fields.items() if f["read"] != "count" and not f.get("optional")}
+        for rec in records or []:
+            for name, value in rec.items():
+                if name in counted and not value:
+                    self.metrics.incr("selector_miss", spec=spec_name, field=name)
+        return records
 
-    def _get_products(self, driver):
-        products_xpath = '//*[@id="main"]/div/div[2]/div/div/div/div/div/div[2]/section/ul'
-        products = []
+    def _extract_product_cards(self, driver, limit):
+        with self.metrics.span("extract.product_list"):
+            cards = self._read_product_cards(driver, limit)
+        if cards is not None and not self.api_capture:
+            self._count_misses("product_list", cards)
+        return cards
+
+    def _read_product_cards(self, driver, limit):
+        if self.api_capture:
+            responses = driver.api_capture.wait_for("search", timeout=15)
+            if responses:
+                return parse_search_items(responses[-1][2], self.base_url)
+            logging.warning("No search API response captured, reading the page instead")
+        if self.fast_extract:
+            try:
+                return extract_records(driver, "product_list", timeout=3)
+            except WebDriverException as e:
+                logging.warning(f"Fast extraction failed, falling back to per-element lookups: {e}")
+        return self._extract_product_cards_legacy(driver, limit)
+
+    def _extract_product_cards_legacy(self, driver, limit):
+        products_xpath = SELECTORS["product_list"]["container"]
+        try:
+            container = driver.find_element(By.XPATH, products_xpath)
+            items = container.find_elements(By.XPATH, './/li')
+        except NoSuchElementException:
+            return None
+
+        cards = []
+        for li in items:
+            if len(cards) >= limit:
+                break
+
+            try:
+                link = li.find_element(By.XPATH, './/a[@class="contents"]').get_attribute("href")
+            except:
+                link = ""
+
+            if link and link in self.scraped_links:
+                logging.info(f"Skipping already scraped product: {link}")
+                continue
+
+            try:
+                name_elem = li.find_element(By.XPATH, './/div[contains(@class, "line-clamp-2")]')
+                name = driver.execute_script("return arguments[0].textContent;", name_elem).strip()
+            except:
+                name = ""
+            try:
+                price = li.find_element(By.XPATH, './/div[@class="truncate flex items-baseline"]').text
+            except:
+                price = ""
+            try:
+                rating = li.find_element(By.XPATH, './/div[@class="text-shopee-black87 text-xs/sp14 flex-none"]').text
+            except:
+                rating = ""
+            try:
+                location = li.find_element(By.XPATH, './/div[@class="flex-shrink min-w-0 truncate text-shopee-black54 font-extralight text-sp10"]').text
+            except:
+                location = ""
+            try:
+                img = li.find_element(By.XPATH, './/img[@class="inset-y-0 w-full h-full pointer-events-none object-contain absolute"]').get_attribute("src")
+            except:
+                img = ""
+
+            cards.append({
+                "link": link,
+                "name": name,
+                "price": price,
+                "rating": rating,
+                "img": img,
+                "location": location
+            })
+        return cards
+
+    def _iter_products(self, driver):
+        # Yields cards page by page, so details can start after the first search page.
+        found = 0
+        queued = set()
 
         products_per_page = 60
         total_pages = -(-self.num_products // products_per_page)
 
         logging.info(f"Total pages to scrape: {total_pages}")
 
+        kw_encoded = re.sub(r'\s+', '%20', self.keyword.strip())
         for page in range(total_pages):
-            search_url = f"https://shopee.ph/search?keyword={re.sub(r'\s+', '%20', self.keyword.strip())}&page={page}&sortBy={self.sort_by}"
+            search_url = f"{self.base_url}/search?keyword={kw_encoded}&page={page}&sortBy={self.sort_by}"
             logging.info(f"Loading page {page+1}/{total_pages}: {search_url}")
 
-            driver.get(search_url)
-            time.sleep(4)
-            self._wait_for_captcha(driver)
-            driver.implicitly_wait(3)
+            with self.metrics.span("search"):
+                if self.api_capture:
+                    driver.api_capture.clear()
+                self._load(driver, search_url)
+                self._wait_for_captcha(driver)
+                if not self.api_capture:
+                    self.pacer.wait(driver, EC.presence_of_element_located((By.XPATH, SELECTORS["product_list"]["container"])), "search_page")
+                driver.implicitly_wait(3)
 
-            try:
-                container = driver.find_element(By.XPATH, products_xpath)
-                items = container.find_elements(By.XPATH, './/li')
-            except NoSuchElementException:
+                if self.snapshots:
+                    self._capture(driver, "search", page=page, keyword=self.keyword, category_info=self.category_info)
+                cards = self._extract_product_cards(driver, self.num_products - found)
+            if cards is None:
                 logging.warning(f"Product container not found on page {page+1}. Skipping.")
                 continue
 
-            for idx, li in enumerate(items):
-                if len(products) >= self.num_products:
-                    return products
-
-                try:
-                    link = li.find_element(By.XPATH, './/a[@class="contents"]').get_attribute("href")
-                except:
-                    link = ""
-
-                if link and link in self.scraped_links:
+            new_cards = []
+            for card in cards:
+                if found + len(new_cards) >= self.num_products:
+                    break
+                link = card["link"]
+                if link and (link in self.scraped_links or link in queued):
                     logging.info(f"Skipping already scraped product: {link}")
                     continue
+                if link:
+                    queued.add(link)
+                new_cards.append(card)
+            found += len(new_cards)
+            logging.info(f"Page {page+1} scraped, total products so far: {found}")
+            yield from new_cards
 
-                try:
-                    name_elem = li.find_element(By.XPATH, './/div[contains(@class, "line-clamp-2")]')
-                    name = driver.execute_script("return arguments[0].textContent;", name_elem).strip()
-                except:
-                    name = ""
-                try:
-                    price = li.find_element(By.XPATH, './/div[@class="truncate flex items-baseline"]').text
-                except:
-                    price = ""
-                try:
-                    rating = li.find_element(By.XPATH, './/div[@class="text-shopee-black87 text-xs/sp14 flex-none"]').text
-                except:
-                    rating = ""
-                try:
-                    location = li.find_element(By.XPATH, './/div[@class="flex-shrink min-w-0 truncate text-shopee-black54 font-extralight text-sp10"]').text
-                except:
-                    location = ""
-                try:
-                    img = li.find_element(By.XPATH, './/img[@class="inset-y-0 w-full h-full pointer-events-none object-contain absolute"]').get_attribute("src")
-                except:
-                    img = ""
-
-                products.append({
-                    "link": link,
-                    "name": name,
-                    "price": price,
-                    "rating": rating,
-                    "img": img,
-                    "location": location
-                })
-
-            logging.info(f"Page {page+1} scraped, total products so far: {len(products)}")
-
-            import random
-            time.sleep(random.uniform(3.0, 7.0))
-        return products
+            if found >= self.num_products:
+                break
+            self.pacer.delay("search_page")
 
     def _parse_star_count(self, text):
         text = text.lower().strip()
@@ -179,177 +309,607 @@ class ProductScraper:
         except:
             return 0
 
-    def _get_product_details(self, driver, product):
-        driver.get(product["link"])
-        driver.implicitly_wait(3)
-        if self.category_info:
-            product["category"] = self.category_info
-        else:
+    def _read_product_page(self, driver):
+        with self.metrics.span("extract.product_detail"):
+            page = self._read_product_page_fields(driver)
+        return self._count_misses("product_detail", [page])[0]
+
+    def _read_product_page_fields(self, driver):
+        if self.fast_extract:
+            try:
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                return extract_fields(driver, "product_detail", wait_for="rating_filters", timeout=3)
+            except WebDriverException as e:
+                logging.warning(f"Fast extraction failed, falling back to per-element lookups: {e}")
+        return self._read_product_page_legacy(driver)
+
+    def _read_product_page_legacy(self, driver):
+        fields = SELECTORS["product_detail"]["fields"]
+        page = {}
+        for key in ("category", "description"):
             try:
-                cat_xpath = '//*[@id="sll2-normal-pdp-main"]/div/div[1]/div/div[2]/div[2]/div/div[1]/div[1]/section[1]/div'
-                product["category"] = driver.find_element(By.XPATH, cat_xpath).text
+                page[key] = driver.find_element(By.XPATH, fields[key]["xpath"]).text
             except:
-                product["category"] = ""
-        try:
-            desc_xpath = '//*[@id="sll2-normal-pdp-main"]/div/div[1]/div/div[2]/div[2]/div/div[1]/div[1]/section[2]/div/div'
-            product["description"] = driver.find_element(By.XPATH, desc_xpath).text
-        except:
-            product["description"] = ""
-        product["detailed_rating"] = {}
-        total_ratings = 0
+                page[key] = ""
+        page["rating_filters"] = []
         try:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             overview_xpath = '//*[@id="sll2-normal-pdp-main"]/div/div/div/div[2]/div[3]/div/div[1]/div[2]/div/div/div[2]/div[2]'
             overview_elem = driver.find_element(By.XPATH, overview_xpath)
             filters = overview_elem.find_elements(By.XPATH, './/div[contains(@class,"product-rating-overview__filter")]')
-            for f in filters:
-                text = f.text.strip()
-                match = re.match(r'(\d+|\D+)\s?(Sao)?\s?\((\d+)\)', text)
-                if match:
-                    star = match.group(1).strip().lower()
-                    val = int(match.group(3))
-                    if star.isdigit():
-                        key = f"{star}_star"
-                    else:
-                        key = "all" if "tất cả" in star else re.sub(r'\s+', '_', star)
-                    if key == "có_bình_luận":
-                        key = "commented"
-                    elif key == "có_hình_ảnh_/_video":
-                        key = "media"
-                    product["detailed_rating"][key] = val
-                    if star.isdigit():
-                        total_ratings += val
+            page["rating_filters"] = [f.text for f in filters]
         except:
             pass
-        product["total_rating"] = total_ratings
+        return page
+
+    def _open_product(self, driver, link, worker_name=None):
+        self.pacer.delay("product_page")
+        self._load(driver, link)
+        self._wait_for_captcha(driver, worker_name)
+        driver.implicitly_wait(3)
+
+    def _get_product_details(self, driver, product, worker_name=None):
+        if self.cache and self._details_from_cache(product):
+            return
+        self._open_product(driver, product["link"], worker_name)
+        self._read_product_details(driver, product)
+
+    def _read_product_details(self, driver, product):
+        # Details and reviews of the product page already open in `driver`.
+        page = self._read_product_page(driver)
+        html = driver.page_source if self.cache else None
+        if self.category_info:
+            product["category"] = self.category_info
+        else:
+            product["category"] = page["category"]
+        product["description"] = page["description"]
+        product["detailed_rating"], product["total_rating"] = parse_rating_filters(page["rating_filters"])
+        complete = True
         if self.all_star_types:
             all_reviews = []
             try:
-                star_filters = driver.find_elements(By.CLASS_NAME, 'product-rating-overview__filter')
-                for filter_div in star_filters:
-                    try:
-                        filter_text = filter_div.text.strip()
-                        if '(' not in filter_text:
-                            continue
-                    except:
+                for filter_div, star, star_count in self._star_filters(driver):
+                    quota = min(star_count, self.star_limit_per_type)
+                    if quota <= 0:
                         continue
-                    match = re.match(r'(\d+)\s?[S|s]ao?\s?\(([^)]*)\)', filter_text)
-                    if match:
-                        star_count = self._parse_star_count(match.group(2))
-                        if star_count > 0:
-                            filter_div.click()
-                            time.sleep(1)
-                            all_reviews += self._get_reviews(driver, min(star_count, self.star_limit_per_type))
+                    reviews = self._filter_reviews(driver, product["link"], quota, star, filter_div)
+                    complete = complete and reviews is not None
+                    all_reviews += reviews or []
                 product["comments"] = all_reviews
             except Exception as e:
-                pass
+                complete = False
+        else:
+            reviews = self._filter_reviews(driver, product["link"], min(product["total_rating"], self.review_limit))
+            complete = reviews is not None
+            product["comments"] = reviews or []
+        # Stored last, so a product page in the cache means its reviews were paged without errors.
+        if html is not None and complete:
+            self.cache.put("pdp", product["link"], html)
+
+    def _details_from_cache(self, product):
+        # Served only when the product page and every review page the limits need are cached.
+        link = product["link"]
+        html = self.cache.get("pdp", link)
+        if html is None:
+            if self.cache.offline:
+                raise LookupError(f"{link} is not in the page cache")
+            return False
+        page = parse_html(html, "product_detail")[0]
+        detailed_rating, total_rating = parse_rating_filters(page["rating_filters"])
+        if self.all_star_types:
+            quotas = [(star, min(count, self.star_limit_per_type)) for star, count in filter(None, map(self._parse_star_filter, page["rating_filters"]))]
         else:
-            all_reviews = self._get_reviews(driver, min(product["total_rating"], self.review_limit))
-            product["comments"] = all_reviews
+            quotas = [(None, min(total_rating, self.review_limit))]
+        comments = []
+        for star, quota in quotas:
+            reviews, resume_page = self._cached_reviews(link, quota, star)
+            if resume_page is not None:
+                return False
+            comments += reviews
+        product["category"] = self.category_info or page["category"]
+        product["description"] = page["description"]
+        product["detailed_rating"], product["total_rating"] = detailed_rating, total_rating
+        product["comments"] = comments
+        self.metrics.incr("cache_products")
+        return True
 
-    def _get_reviews(self, driver, max_reviews):
+    def _cached_reviews(self, link, quota, star=None):
+        """Reviews from the cached pages of a filter, and the first page (0-based)
+        still to load live, or None once the quota is met or a short page ends the list."""
+        if quota <= 0:
+            return [], None
         reviews = []
-        try:
-            start_time = time.time()
-            rating_container = None
-            while time.time() - start_time < 5:
-                try:
-                    rating_container = driver.find_element(By.CLASS_NAME, 'product-ratings__list')
-                    break
-                except:
-                    time.sleep(0.1)
-            if not rating_container:
-                return reviews
-        except:
-            return reviews
-        with tqdm(total=max_reviews, desc="Collecting reviews") as pbar:
-            while len(reviews) < max_reviews:
-                rating_items = rating_container.find_elements(By.XPATH, './/div[contains(@class,"shopee-product-rating__main")]')
-                for item in rating_items:
-                    if len(reviews) >= max_reviews:
-                        break
-                    review = {}
-                    try:
-                        review["author"] = item.find_element(By.CLASS_NAME,'shopee-product-rating__author-name').text.strip()
-                    except:
-                        review["author"] = ""
-                    try:
-                        star_elems = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__rating"]').find_elements(By.XPATH, '*')
-                        solid_stars = [s for s in star_elems if 'shopee-svg-icon icon-rating-solid--active icon-rating-solid' in (s.get_attribute('class') or '')]
-                        review["rating"] = len(solid_stars)
-                    except:
-                        review["rating"] = 0
-                    try:
-                        review["time"] = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__time"]').text.strip()
-                    except:
-                        review["time"] = ""
-                    try:
-                        review["content"] = item.find_element(By.XPATH, './/div[@style="position: relative; box-sizing: border-box; margin: 15px 0px; font-size: 14px; line-height: 20px; color: rgba(0, 0, 0, 0.87); word-break: break-word; white-space: pre-wrap;"]').text.strip()
-                    except:
-                        review["content"] = ""
-                    try:
-                        review["seller_respond"] = item.find_element(By.XPATH, './/div[@class="TQTPT9"]//div[@class="qiTixQ"]').text.strip()
-                    except:
-                        review["seller_respond"] = ""
-                    try:
-                        like_text = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__like-count"]').text.strip()
-                        review["like_count"] = int(like_text) if like_text.isdigit() else 0
-                    except:
-                        review["like_count"] = 0
+        seen = set()
+        pages = 0
+        while pages <= -(-quota // REVIEWS_PER_PAGE):
+            html = self.cache.get("review", link, star=star, page=pages)
+            if html is None:
+                break
+            pages += 1
+            page_reviews = [finish_review(r) for r in parse_html(html, "review") or []]
+            for review in page_reviews:
+                key = review_key(review)
+                if key not in seen:
+                    seen.add(key)
                     reviews.append(review)
-                    pbar.update(1)
-                next_buttons = [ (By.CLASS_NAME, 'shopee-svg-icon icon-arrow-right') ]
-                for by, value in next_buttons:
-                    try:
-                        next_button = driver.find_element(by, value)
-                        next_button.click()
-                        time.sleep(1)
-                        break
-                    except:
+            if len(reviews) >= quota or len(page_reviews) < REVIEWS_PER_PAGE:
+                return reviews[:quota], None
+        # Offline runs keep what is cached.
+        return reviews, (None if self.cache.offline else pages)
+
+    def _filter_reviews(self, driver, link, quota, star=None, filter_div=None):
+        # Cached pages are used as they are; the live pager jumps to the first page that is not cached.
+        cached, first_page = self._cached_reviews(link, quota, star) if self.cache else ([], 0)
+        if first_page is None:
+            return cached
+        if filter_div is not None:
+            self._select_star_filter(driver, filter_div)
+        if first_page:
+            logging.info(f"Resuming reviews at page {first_page + 1} after {len(cached)} cached")
+        reviews = self._get_reviews(driver, quota - len(cached), link, star, first_page, {review_key(r) for r in cached})
+        return None if reviews is None else cached + reviews
+
+    def _get_product_details_api(self, driver, product, worker_name=None):
+        capture = driver.api_capture
+        capture.clear()
+        self._open_product(driver, product["link"], worker_name)
+        items = capture.wait_for("item", timeout=15)
+        if not items:
+            logging.warning(f"No item API response for {product['link']}, reading the page instead")
+            return self._read_product_details(driver, product)
+        details = parse_item(items[-1][2])
+        product.update({k: v for k, v in details.items() if v is not None})
+        if self.category_info:
+            product["category"] = self.category_info
+        # The ratings widget is lazy-loaded; scrolling triggers its first API call.
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        if self.all_star_types:
+            comments = []
+            capture.wait_for("ratings", timeout=5)
+            for filter_div, star, star_count in self._star_filters(driver):
+                capture.clear()
+                filter_div.click()
+                comments += self._collect_api_reviews(driver, min(star_count, self.star_limit_per_type), star)
+        else:
+            comments = self._collect_api_reviews(driver, min(product["total_rating"], self.review_limit))
+        product["comments"] = comments
+
+    def _collect_api_reviews(self, driver, max_reviews, star=None):
+        reviews = []
+        seen = set()
+        while len(reviews) < max_reviews:
+            responses = driver.api_capture.wait_for("ratings", timeout=10)
+            new_reviews = 0
+            for _, _, data in responses:
+                for review in parse_ratings(data):
+                    if review["cmtid"] in seen or (star and review["rating"] != star):
                         continue
+                    seen.add(review["cmtid"])
+                    reviews.append(review)
+                    new_reviews += 1
+            if not new_reviews or len(reviews) >= max_reviews or not self._click_next_review_page(driver):
+                break
+        return reviews[:max_reviews]
+
+    def _parse_star_filter(self, filter_text):
+        # "5 Sao (1,2k)" -> (5, 1200); None for the other filters.
+        filter_text = filter_text.strip()
+        if '(' not in filter_text:
+            return None
+        match = re.match(r'(\d+)\s?[S|s]ao?\s?\(([^)]*)\)', filter_text)
+        if match:
+            star_count = self._parse_star_count(match.group(2))
+            if star_count > 0:
+                return int(match.group(1)), star_count
+        return None
+
+    def _star_filters(self, driver):
+        star_filters = driver.find_elements(By.CLASS_NAME, 'product-rating-overview__filter')
+        for filter_div in star_filters:
+            try:
+                parsed = self._parse_star_filter(filter_div.text)
+            except:
+                continue
+            if parsed:
+                yield (filter_div,) + parsed
+
+    def _capture(self, driver, kind, **meta):
+        self.snapshots.save(kind, driver.current_url, driver.page_source, meta)
+
+    def _capture_product_pages(self, driver, product, worker_name=None):
+        link = product["link"]
+        self._open_product(driver, link, worker_name)
+        page = self._read_product_page(driver)
+        self._capture(driver, "pdp", link=link, category_info=self.category_info)
+        if self.all_star_types:
+            for filter_div, star, star_count in self._star_filters(driver):
+                self._select_star_filter(driver, filter_div)
+                self._capture_review_pages(driver, link, min(star_count, self.star_limit_per_type), star)
+        else:
+            _, total_rating = parse_rating_filters(page["rating_filters"])
+            self._capture_review_pages(driver, link, min(total_rating, self.review_limit))
+
+    def _capture_review_pages(self, driver, link, max_reviews, star=None):
+        if max_reviews <= 0 or self._wait_for_review_list(driver) is None:
+            return
+        pages = -(-max_reviews // REVIEWS_PER_PAGE)
+        for page in range(pages):
+            if page and not self._click_next_review_page(driver):
+                break
+            self._capture(driver, "review", link=link, page=page, star=star, quota=max_reviews)
+
+    def _extract_reviews(self, driver, rating_container, limit):
+        with self.metrics.span("extract.review"):
+            reviews = self._read_reviews(driver, rating_container, limit)
+        return self._count_misses("review", reviews)
+
+    def _read_reviews(self, driver, rating_container, limit):
+        if self.fast_extract:
+            try:
+                records = extract_records(driver, "review")
+                if records is not None:
+                    return [finish_review(review) for review in records[:limit]]
+            except WebDriverException as e:
+                logging.warning(f"Fast extraction failed, falling back to per-element lookups: {e}")
+        if rating_container is None:
+            rating_container = driver.find_element(By.CLASS_NAME, 'product-ratings__list')
+        return self._extract_reviews_legacy(rating_container, limit)
+
+    def _extract_reviews_legacy(self, rating_container, limit):
+        reviews = []
+        rating_items = rating_container.find_elements(By.XPATH, './/div[contains(@class,"shopee-product-rating__main")]')
+        for item in rating_items:
+            if len(reviews) >= limit:
+                break
+            review = {}
+            try:
+                review["author"] = item.find_element(By.CLASS_NAME,'shopee-product-rating__author-name').text.strip()
+            except:
+                review["author"] = ""
+            try:
+                star_elems = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__rating"]').find_elements(By.XPATH, '*')
+                solid_stars = [s for s in star_elems if 'shopee-svg-icon icon-rating-solid--active icon-rating-solid' in (s.get_attribute('class') or '')]
+                review["rating"] = len(solid_stars)
+            except:
+                review["rating"] = 0
+            try:
+                review["time"] = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__time"]').text.strip()
+            except:
+                review["time"] = ""
+            try:
+                review["content"] = item.find_element(By.XPATH, './/div[@style="position: relative; box-sizing: border-box; margin: 15px 0px; font-size: 14px; line-height: 20px; color: rgba(0, 0, 0, 0.87); word-break: break-word; white-space: pre-wrap;"]').text.strip()
+            except:
+                review["content"] = ""
+            try:
+                review["seller_respond"] = item.find_element(By.XPATH, './/div[@class="TQTPT9"]//div[@class="qiTixQ"]').text.strip()
+            except:
+                review["seller_respond"] = ""
+            try:
+                like_text = item.find_element(By.XPATH, './/div[@class="shopee-product-rating__like-count"]').text.strip()
+                review["like_count"] = int(like_text) if like_text.isdigit() else 0
+            except:
+                review["like_count"] = 0
+            reviews.append(review)
         return reviews
 
-    def run(self):
-        options = uc.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--start-maximized")
-        if sys.platform.startswith('linux'):
-            options.add_argument("--disable-gpu")
-        driver = uc.Chrome(options=options, enable_cdp_events=False, headless=False, version_main=144)
-        driver.maximize_window()
-        url = self._build_search_url()
-        logging.info(f"Search URL: {url}")
-        driver.get(url)
-        time.sleep(5)
-        self._wait_for_captcha(driver)
-        driver.implicitly_wait(5)
-        
-        new_products = self._get_products(driver)
-        logging.info(f"Found {len(new_products)} new products to scrape")
-        
-        all_products = self.existing_products.copy()
-        
-        for idx, prod in enumerate(tqdm(new_products, desc="Processing products"), 1):
+    def _wait_for_review_list(self, driver):
+        return self.pacer.wait(driver, EC.presence_of_element_located((By.CLASS_NAME, 'product-ratings__list')), "review_list")
+
+    def _select_star_filter(self, driver, filter_div):
+        before = review_fingerprint(driver)
+        filter_div.click()
+        self.pacer.wait(driver, review_list_changed(before), "star_filter")
+        self.pacer.delay("star_filter")
+
+    def _review_pager(self, driver, link=None, star=None, first_page=0):
+        pages = itertools.count(first_page)
+
+        def extract(limit):
+            if self.cache and link:
+                self.cache.put("review", link, driver.execute_script(REVIEW_LIST_JS), star=star, page=next(pages))
+            # The list is re-rendered on every page, so the legacy path looks it up again each time.
+            return self._extract_reviews(driver, None, limit)
+
+        return ReviewPager(driver, self.pacer, extract, self.metrics)
+
+    def _click_next_review_page(self, driver):
+        return self._review_pager(driver).next()
+
+    def _get_reviews(self, driver, max_reviews, link=None, star=None, first_page=0, known_keys=None):
+        """Up to `max_reviews` reviews of the current filter from page `first_page`
+        (0-based) on, or None if paging failed."""
+        if max_reviews <= 0:
+            return []
+        try:
+            with tqdm(total=max_reviews, desc="Collecting reviews") as pbar:
+                pager = self._review_pager(driver, link, star, first_page)
+                return pager.collect(max_reviews, known_keys=known_keys, start_page=first_page + 1, progress=pbar.update)
+        except Exception as e:
+            logging.warning(f"Review paging failed: {e}")
+            return None
+
+    def _create_driver(self):
+        if self.session_pool:
+            driver = self.session_pool.lease().driver
+        else:
+            driver = create_chrome(enable_cdp_events=self.api_capture)
+        if self.api_capture:
+            if getattr(driver, "api_capture", None) is None:
+                driver.api_capture = ApiCapture().attach(driver)
+            driver.api_capture.recorder = self.har_recorder
+        return driver
+
+    def _release_driver(self, driver, broken=False):
+        # Pooled browsers go back to the pool warm; others are shut down.
+        if self.session_pool:
+            self.session_pool.release(driver, broken)
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _merge_product(self, prod):
+        link = prod.get('link')
+        if link and link in self.scraped_links:
+            logging.info(f"Skipping duplicate product: {link}")
+            return False
+        if not self.snapshots:
+            self.sink.append(prod)
+        if link:
+            self.scraped_links.add(link)
+        return True
+
+    def _process_product(self, driver, prod, worker_name=None):
+        try:
+            with self.metrics.span("product"):
+                self._process_product_pages(driver, prod, worker_name)
+        except CaptchaBlocked:
+            raise
+        except Exception:
+            self.metrics.incr("product_errors")
+            raise
+        self.metrics.incr("products")
+
+    def _process_product_pages(self, driver, prod, worker_name=None):
+        if self.snapshots and not self.index_only:
+            self._capture_product_pages(driver, prod, worker_name)
+        elif not self.index_only and self.api_capture:
+            self._get_product_details_api(driver, prod, worker_name)
+        elif not self.index_only:
+            self._get_product_details(driver, prod, worker_name)
+        else:
+            if self.category_info:
+                prod["category"] = self.category_info
+
+    def _scrape_sequential(self, driver, products):
+        # One browser alternates: a search page, then the details of its cards.
+        merged = 0
+        for prod in tqdm(products, total=self.num_products, desc="Processing products"):
             try:
-                if not self.index_only:
-                    self._get_product_details(driver, prod)
-                else:
-                    if self.category_info:
-                        prod["category"] = self.category_info
-                all_products.append(prod)
-                if prod.get('link'):
-                    self.scraped_links.add(prod['link'])
-                if idx % 5 == 0:
-                    self._periodic_save(all_products)
+                self._process_product(driver, prod)
+                if self._merge_product(prod):
+                    merged += 1
+                    if merged % 5 == 0:
+                        self._periodic_save()
+            except CaptchaBlocked:
+                self._periodic_save()
+                raise
             except Exception as e:
-                self._periodic_save(all_products)
-        
-        driver.quit()
+                self._periodic_save()
+        return merged
+
+    def _detail_one(self, worker_name, driver, prod, retry, results):
+        # Returns False once this worker's session is unusable.
+        try:
+            self._process_product(driver, prod, worker_name)
+            results.put(prod)
+        except CaptchaBlocked:
+            # The product goes back for the other workers while this session is parked.
+            retry.put(prod)
+            try:
+                self._park(driver, worker_name)
+            except CaptchaBlocked:
+                return False
+        except Exception as e:
+            logging.warning(f"[{worker_name}] Failed to scrape {prod.get('link', '')}: {e}")
+        return True
+
+    def _next_product(self, work_queue, retry, listing_done):
+        while True:
+            try:
+                return retry.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                return work_queue.get(timeout=0.5)
+            except queue.Empty:
+                if listing_done.is_set() and work_queue.empty() and retry.empty():
+                    return None
+
+    def _detail_worker(self, worker_name, driver, work_queue, retry, results, listing_done):
+        created = driver is None
+        broken = False
+        try:
+            if created:
+                driver = self._create_driver()
+            while True:
+                prod = self._next_product(work_queue, retry, listing_done)
+                if prod is None:
+                    break
+                if not self._detail_one(worker_name, driver, prod, retry, results):
+                    broken = True
+                    break
+        except Exception as e:
+            logging.warning(f"[{worker_name}] Worker stopped: {e}")
+        finally:
+            if created and driver is not None:
+                self._release_driver(driver, broken)
+            results.put(None)
+
+    def _list_and_detail(self, driver, work_queue, retry, results, listing_done, others):
+        # The search browser lists into the bounded queue, waiting whenever the
+        # detail workers fall behind, then joins them as worker-1.
+        try:
+            for prod in self._iter_products(driver):
+                while True:
+                    try:
+                        work_queue.put(prod, timeout=1)
+                        break
+                    except queue.Full:
+                        if not any(t.is_alive() for t in others):
+                            # No other worker is left to drain the queue.
+                            self._detail_one("worker-1", driver, work_queue.get(), retry, results)
+        except Exception as e:
+            logging.warning(f"[worker-1] Search listing stopped: {e}")
+        finally:
+            listing_done.set()
+        self._detail_worker("worker-1", driver, work_queue, retry, results, listing_done)
+
+    def _scrape_parallel(self, driver):
+        # Memory stays bounded by the queues, whatever --num is.
+        buffer_size = max(2 * self.workers, 4)
+        work_queue = queue.Queue(maxsize=buffer_size)
+        retry = queue.Queue()
+        results = queue.Queue(maxsize=buffer_size)
+        listing_done = threading.Event()
+        num_workers = min(self.workers, self.num_products)
+        logging.info(f"Starting {num_workers} browser workers")
+        others = [
+            threading.Thread(target=self._detail_worker, args=(f"worker-{i+1}", None, work_queue, retry, results, listing_done), daemon=True)
+            for i in range(1, num_workers)
+        ]
+        threads = [threading.Thread(target=self._list_and_detail, args=(driver, work_queue, retry, results, listing_done, others), daemon=True)] + others
+        for t in threads:
+            t.start()
+
+        merged = 0
+        finished = 0
+        with tqdm(total=self.num_products, desc="Processing products") as pbar:
+            while finished < num_workers:
+                prod = results.get()
+                if prod is None:
+                    finished += 1
+                    continue
+                pbar.update(1)
+                if self._merge_product(prod):
+                    merged += 1
+                    if merged % 5 == 0:
+                        self._periodic_save()
+        for t in threads:
+            t.join()
+        left = work_queue.qsize() + retry.qsize()
+        if left:
+            logging.warning(f"{left} products were left unscraped by blocked sessions; run again to resume")
+        return merged
+
+    def run(self, driver=None):
+        # A driver passed in belongs to the caller (e.g. a long-lived session) and is left open.
+        owns_driver = driver is None
+        if owns_driver:
+            driver = self._create_driver()
+        blocked = False
+        scraped = 0
+        try:
+            with self.metrics.span("run"):
+                try:
+                    url = self._build_search_url()
+                    logging.info(f"Search URL: {url}")
+                    self._load(driver, url)
+                    self.pacer.wait(driver, document_ready, "page_ready")
+                    self._wait_for_captcha(driver)
+                    driver.implicitly_wait(5)
+
+                    if self.workers > 1 and self.num_products > 1:
+                        scraped = self._scrape_parallel(driver)
+                    else:
+                        scraped = self._scrape_sequential(driver, self._iter_products(driver))
+                except CaptchaBlocked as e:
+                    blocked = True
+                    if self.captcha_handoff:
+                        raise
+                    logging.warning(f"Stopping early: {e}. Progress is saved; run again to resume.")
+        finally:
+            # Runs handed off or stopped by an error keep every product appended so far.
+            if owns_driver:
+                self._release_driver(driver, blocked)
+            self._close_sink()
 
-        self._periodic_save(all_products)
-        logging.info(f"Completed! Total {len(all_products)} products saved to {self.output_file}")
+        if self.har_recorder:
+            self.har_recorder.save()
+        if self.snapshots:
+            logging.info(f"Completed! Snapshots for {scraped} products saved to {self.snapshots.root}")
+            self._write_metrics()
+            return
+        with self.metrics.span("export"):
+            self._export()
+        logging.info(f"Pacing: {json.dumps(self.pacer.summary())}")
+        self._write_metrics()
+
+    def _write_metrics(self):
+        report_path = os.path.splitext(self.output_file)[0] + ".metrics.json"
+        try:
+            self.metrics.write_report(report_path, keyword=self.keyword, pacing=self.pacer.summary(), captcha=self.captcha.summary(),
+                                      cache=self.cache.summary() if self.cache else None)
+            if self.profile_path:
+                self.metrics.write_profile(self.profile_path)
+        except Exception as e:
+            logging.warning(f"Could not write run metrics: {e}")
+
+    def _refresh_product(self, driver, product):
+        self._open_product(driver, product["link"])
+        page = self._read_product_page(driver)
+        detailed_rating, total_rating = parse_rating_filters(page["rating_filters"])
+        if not detailed_rating or detailed_rating == product.get("detailed_rating"):
+            return None
+        # Only the ratings added since the last run need to be paged through.
+        new_count = max(total_rating - (product.get("total_rating") or 0), 0)
+        known = self.sink.review_keys(product["link"])
+        newest = self.sink.newest_review_time(product["link"])
+        product["detailed_rating"] = detailed_rating
+        product["total_rating"] = total_rating
+        product["comments"] = self._collect_new_reviews(driver, known, min(new_count, self.review_limit), newest)
+        return product
+
+    def _collect_new_reviews(self, driver, known_keys, max_reviews, newest=None):
+        # Only reviews from the newest stored one's minute on count as new, and paging
+        # stops at the first page without any; older reviews past the last run's limit stay out.
+        return self._review_pager(driver).collect(max_reviews, known_keys=known_keys, newer_than=newest)
+
+    def refresh(self):
+        driver = self._create_driver()
+        checked = 0
+        updated = 0
+        new_reviews = 0
+        blocked = False
+        total = self.sink.product_count()
+        try:
+            for product in tqdm(self.sink.iter_products(with_reviews=False), total=total, desc="Refreshing products"):
+                checked += 1
+                try:
+                    with self.metrics.span("refresh_product"):
+                        refreshed = self._refresh_product(driver, product)
+                except CaptchaBlocked as e:
+                    blocked = True
+                    logging.warning(f"Stopping early: {e}. Progress is saved; run again to resume.")
+                    break
+                except Exception as e:
+                    logging.warning(f"Could not refresh {product.get('link', '')}: {e}")
+                    continue
+                if refreshed is None:
+                    continue
+                self.sink.append(refreshed)
+                updated += 1
+                new_reviews += len(refreshed["comments"])
+                if updated % 5 == 0:
+                    self._periodic_save()
+        finally:
+            self._release_driver(driver, blocked)
+            self._close_sink()
+        logging.info(f"Pacing: {json.dumps(self.pacer.summary())}")
+        logging.info(f"Refresh done: {checked} checked, {updated} changed, {checked - updated} unchanged, {new_reviews} new reviews")
+        self._export()
+        self._write_metrics()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Shopee Scraper - Crawl product and review data from Shopee.ph")
@@ -379,7 +939,44 @@ if __name__ == "__main__":
         choices=["1month", "3months", "6months", "1year"],
         help="Filter by time: 1month, 3months, 6months, 1year"
     )
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of parallel browser workers for product details")
+    parser.add_argument("--no-fast-extract", dest="fast_extract", action="store_false", default=True, help="Read fields with one WebDriver call each instead of one script per page")
+    parser.add_argument("--capture-only", dest="capture_dir", default=None, help="Only save compressed page snapshots to this directory; parse them later with snapshot_parser.py")
+    parser.add_argument("--api-capture", action="store_true", default=False, help="Read Shopee's JSON API responses via CDP instead of page text")
+    parser.add_argument("--record-har", default=None, help="Record captured API responses to this HAR file (implies --api-capture)")
+    parser.add_argument("--store", dest="store_path", default=None, help="Write products and reviews to this SQLite store instead of a JSONL file")
+    parser.add_argument("--refresh", action="store_true", default=False, help="Revisit stored products and fetch only reviews added since the last run (requires --store)")
+    parser.add_argument("--pace", action="append", type=parse_pace, default=[], metavar="PHASE=MIN:MAX", help="Delay range in seconds for a phase (search_page, product_page, review_page, star_filter); repeatable")
+    parser.add_argument("--no-adaptive-pace", dest="adaptive_pace", action="store_false", default=True, help="Keep delays fixed instead of backing off on captchas")
+    parser.add_argument("--profile", dest="profile_path", default=None, help="Write a folded-stack trace of timing spans to this file (flamegraph.pl / speedscope)")
+    parser.add_argument("--base-url", default="https://shopee.ph", help="Shopee site to scrape (e.g. a local mock server)")
+    parser.add_argument("--user-data-dir", default=None, help="Keep one persistent Chrome profile per browser under this directory (cookies and logins survive between runs)")
+    parser.add_argument("--lite", action="store_true", default=False, help="Run Chrome headless with a small window and without images, fonts, media or trackers")
+    parser.add_argument("--chrome-version", type=int, default=None, help="Major version of the installed Chrome (default: detect automatically)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus-style metrics on this local port while scraping")
+    parser.add_argument("--captcha-notify", action="append", type=make_notifier, default=[], metavar="cli|file:PATH|webhook:URL", help="Where to announce parked and cleared captchas (default: cli); repeatable")
+    parser.add_argument("--captcha-timeout", type=float, default=None, help="Give up on a session whose captcha is not solved within this many seconds (default: wait until solved)")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="off", help="Serve product and review pages from the local page cache: off, read-through (fetch and store what is missing or expired) or offline-only (never load them live)")
+    parser.add_argument("--cache-dir", default=".shopee_cache", help="Page cache directory")
+    parser.add_argument("--cache-size-mb", type=int, default=512, help="Evict least recently used pages beyond this compressed size")
+    parser.add_argument("--cache-ttl", action="append", type=parse_ttl, default=[], metavar="KIND=SECONDS", help="How long cached pdp or review pages stay fresh; repeatable")
     args = parser.parse_args()
+    if args.refresh and not args.store_path:
+        parser.error("--refresh requires --store")
+    if args.cache_mode != "off" and (args.api_capture or args.record_har or args.capture_dir):
+        parser.error("--cache-mode caches rendered pages and cannot be combined with --api-capture, --record-har or --capture-only")
+    cache = None
+    if args.cache_mode != "off":
+        cache = PageCache(args.cache_dir, args.cache_mode, dict(args.cache_ttl), args.cache_size_mb * 1024 * 1024)
+    metrics = Metrics(profile=bool(args.profile_path))
+    session_pool = SessionPool(
+        size=args.workers,
+        profile_root=args.user_data_dir,
+        version_main=args.chrome_version,
+        enable_cdp_events=args.api_capture or bool(args.record_har),
+        metrics=metrics,
+        lite=args.lite
+    )
     scraper = ProductScraper(
         args.keyword,
         args.num,
@@ -389,6 +986,30 @@ if __name__ == "__main__":
         star_limit_per_type=args.star_limit_per_type,
         sort_by=args.sort_by,
         category=args.category,
-        time_range=args.time_range
+        time_range=args.time_range,
+        workers=args.workers,
+        fast_extract=args.fast_extract,
+        capture_dir=args.capture_dir,
+        api_capture=args.api_capture,
+        record_har=args.record_har,
+        store_path=args.store_path,
+        pacer=Pacer(delays=dict(args.pace), adaptive=args.adaptive_pace),
+        profile_path=args.profile_path,
+        metrics=metrics,
+        session_pool=session_pool,
+        base_url=args.base_url,
+        captcha=CaptchaHandler(args.captcha_notify, timeout=args.captcha_timeout, metrics=metrics),
+        cache=cache
     )
-    scraper.run()
+    if args.metrics_port:
+        scraper.metrics.serve(args.metrics_port)
+    try:
+        if args.refresh:
+            scraper.refresh()
+        else:
+            scraper.run()
+    finally:
+        session_pool.close()
+        if cache:
+            logging.info(f"Page cache: {json.dumps(cache.summary())}")
+            cache.close()
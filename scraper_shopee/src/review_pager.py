@@ -0,0 +1,166 @@
+import logging
+from contextlib import nullcontext
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from pacing import review_fingerprint, review_list_changed
+from product_store import review_key, review_timestamp
+
+# Review pagination on a product page. Pages are identified by the active
+# pager button plus the first review on the list, reviews are deduplicated by
+# review_key, and paging always stops: when the quota is met, when a page only
+# repeats reviews already seen, when the pager does not move, when a refresh
+# reaches a page of reviews older than the stored ones, or after a page bound
+# (by default the number of pages the quota can need).
+
+REVIEWS_PER_PAGE = 6
+
+_PAGER_JS = """
+var ctl = document.querySelector('.shopee-page-controller');
+if (!ctl) return null;
+var active = ctl.querySelector('.shopee-button-solid--primary');
+var pages = [];
+var buttons = ctl.querySelectorAll('button');
+for (var i = 0; i < buttons.length; i++) {
+    var n = parseInt(buttons[i].textContent, 10);
+    if (!isNaN(n)) pages.push(n);
+}
+var arrow = ctl.querySelector('.icon-arrow-right');
+var next = arrow ? (arrow.closest('button') || arrow) : null;
+return {active: active ? parseInt(active.textContent, 10) : null, pages: pages, has_next: !!next && !next.disabled};
+"""
+PAGE_BUTTON_XPATH = '//div[contains(@class, "shopee-page-controller")]/button[normalize-space()="{}"]'
+NEXT_ARROW_CSS = '.shopee-page-controller .shopee-svg-icon.icon-arrow-right'
+
+
+class ReviewPager:
+    def __init__(self, driver, pacer, extract, metrics=None, per_page=REVIEWS_PER_PAGE):
+        # extract(limit) reads up to `limit` reviews from the page as it is now.
+        self.driver = driver
+        self.pacer = pacer
+        self.extract = extract
+        self.metrics = metrics
+        self.per_page = per_page
+
+    def _incr(self, name, value=1):
+        if self.metrics:
+            self.metrics.incr(name, value)
+
+    def state(self):
+        try:
+            return self.driver.execute_script(_PAGER_JS)
+        except Exception:
+            return None
+
+    def wait_for_list(self):
+        return self.pacer.wait(self.driver, EC.presence_of_element_located((By.CLASS_NAME, 'product-ratings__list')), "review_list")
+
+    def _click(self, element):
+        before = review_fingerprint(self.driver)
+        element.click()
+        # A click that never changes the list would re-read the same page.
+        if not self.pacer.wait(self.driver, review_list_changed(before), "review_page"):
+            return False
+        self.pacer.delay("review_page")
+        return True
+
+    def goto(self, page):
+        """Moves to review page `page` (1-based), clicking its pager button
+        directly when visible, otherwise the furthest visible button towards it."""
+        for _ in range(page + 1):
+            state = self.state()
+            if not state or state["active"] is None:
+                return False
+            if state["active"] == page:
+                return True
+            if page in state["pages"]:
+                target = page
+            elif page > state["active"]:
+                target = max([p for p in state["pages"] if state["active"] < p < page], default=None)
+            else:
+                target = min([p for p in state["pages"] if page < p < state["active"]], default=None)
+            try:
+                if target is not None:
+                    clicked = self._click(self.driver.find_element(By.XPATH, PAGE_BUTTON_XPATH.format(target)))
+                elif page > state["active"] and state["has_next"]:
+                    clicked = self._click(self.driver.find_element(By.CSS_SELECTOR, NEXT_ARROW_CSS))
+                else:
+                    return False
+            except Exception:
+                return False
+            if not clicked:
+                return False
+        return False
+
+    def next(self):
+        state = self.state()
+        if state and state["active"] is not None:
+            if not state["has_next"] and state["active"] + 1 not in state["pages"]:
+                return False
+            return self.goto(state["active"] + 1)
+        try:
+            return self._click(self.driver.find_element(By.CSS_SELECTOR, NEXT_ARROW_CSS))
+        except Exception:
+            return False
+
+    def collect(self, max_reviews, known_keys=None, max_pages=None, start_page=1, newer_than=None, progress=None):
+        """Collects up to `max_reviews` unique reviews from the current filter.
+
+        Reviews in `known_keys`, and reviews dated before `newer_than` (epoch
+        seconds), are skipped; a page holding nothing else ends paging, since
+        everything newer sits above it. `max_pages` bounds how far it goes
+        (default: the pages the quota can need, plus one). `progress(n)` is
+        called with the number of new reviews after every page."""
+        reviews = []
+        if max_reviews <= 0 or self.wait_for_list() is None:
+            return reviews
+        if start_page > 1 and not self.goto(start_page):
+            return reviews
+        seen = set()
+        last_identity = None
+        if max_pages is None:
+            # One spare page absorbs a page that only repeats reviews already seen.
+            max_pages = -(-max_reviews // self.per_page) + 1
+        for _ in range(max_pages):
+            identity = review_fingerprint(self.driver)
+            if identity is None or identity == last_identity:
+                break
+            last_identity = identity
+            with self.metrics.span("review_page") if self.metrics else nullcontext():
+                page_reviews = self.extract(self.per_page)
+                new_reviews = 0
+                unseen = 0
+                older = 0
+                for review in page_reviews:
+                    key = review_key(review)
+                    if key in seen:
+                        self._incr("review_duplicates")
+                        continue
+                    seen.add(key)
+                    unseen += 1
+                    if known_keys and key in known_keys:
+                        older += 1
+                        continue
+                    if newer_than is not None:
+                        stamp = review_timestamp(review)
+                        if stamp is not None and stamp < newer_than:
+                            older += 1
+                            continue
+                    reviews.append(review)
+                    new_reviews += 1
+                    if len(reviews) >= max_reviews:
+                        break
+                self._incr("reviews", new_reviews)
+                if progress:
+                    progress(new_reviews)
+                # The quota check comes first so a finished filter never loads another page.
+                # A page that only repeats this run's reviews stops, and so does one of
+                # stored or older reviews when refreshing.
+                if len(reviews) >= max_reviews or not unseen:
+                    break
+                if newer_than is not None and older == unseen:
+                    break
+                if not self.next():
+                    break
+        else:
+            logging.info(f"Stopped paging after {len(reviews)}/{max_reviews} reviews at the page limit")
+        return reviews
@@ -0,0 +1,263 @@
+import os
+import sys
+import time
+import logging
+import threading
+import undetected_chromedriver as uc
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Chrome start-up plus a pool of warm, reusable browser sessions. Each pool
+# slot keeps its own user-data dir, so cookies and a solved login/captcha
+# survive driver restarts and later runs. Sessions are health-checked when
+# leased and recycled after a number of page loads or once the browser's
+# processes (the Chrome process tree, renderers included) grow past a memory limit.
+
+_chrome_lock = threading.Lock()
+
+# Lite mode only keeps what the scraper reads: DOM text, attributes and the
+# JSON APIs. Images are disabled through blink settings (their src attribute
+# is still in the DOM); fonts, media and trackers are blocked over CDP.
+LITE_WINDOW_SIZE = (1024, 768)
+LITE_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.gif",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*facebook.com/tr*", "*analytics.tiktok.com*",
+    "*criteo.*", "*hotjar.com*", "*clarity.ms*",
+]
+
+
+def create_chrome(enable_cdp_events=False, version_main=None, user_data_dir=None, lite=False):
+    options = uc.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if lite:
+        options.add_argument(f"--window-size={LITE_WINDOW_SIZE[0]},{LITE_WINDOW_SIZE[1]}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+    else:
+        options.add_argument("--start-maximized")
+    if sys.platform.startswith('linux'):
+        options.add_argument("--disable-gpu")
+    # undetected_chromedriver patches the chromedriver binary on start-up,
+    # so concurrent launches from several workers must be serialized.
+    with _chrome_lock:
+        driver = uc.Chrome(
+            options=options,
+            enable_cdp_events=enable_cdp_events,
+            headless=lite,
+            version_main=version_main,
+            user_data_dir=user_data_dir
+        )
+    if lite:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LITE_BLOCKED_URLS})
+    else:
+        driver.maximize_window()
+    return driver
+
+
+def _proc_children():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants, in MB. Uses
+    psutil when installed, otherwise /proc (Linux); 0.0 if neither works."""
+    if not pid:
+        return 0.0
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            total = 0
+            for proc in [root] + root.children(recursive=True):
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            return total / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+    if not os.path.isdir("/proc"):
+        return 0.0
+    children = _proc_children()
+    pids, total_kb = [pid], 0
+    while pids:
+        current = pids.pop()
+        total_kb += _proc_rss_kb(current)
+        pids.extend(children.get(current, []))
+    return total_kb / 1024
+
+
+def browser_pid(driver):
+    # undetected_chromedriver starts Chrome detached from chromedriver, so the
+    # browser is not in chromedriver's process tree.
+    pid = getattr(driver, "browser_pid", None)
+    if pid:
+        return pid
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return process.pid if process else None
+
+
+class Session:
+    def __init__(self, name, profile_dir=None):
+        self.name = name
+        self.profile_dir = profile_dir
+        self.driver = None
+        self.pages = 0
+        self.started_at = None
+        self.leases = 0
+
+    def _count_pages(self):
+        # Every driver.get is a page load towards the recycle limit.
+        get = self.driver.get
+
+        def counted_get(url):
+            self.pages += 1
+            return get(url)
+        self.driver.get = counted_get
+
+
+class SessionPool:
+    def __init__(self, size=1, profile_root=None, version_main=None, enable_cdp_events=False, max_pages=300, max_memory_mb=1536, metrics=None, lite=False):
+        self.size = max(1, size)
+        self.profile_root = profile_root
+        self.version_main = version_main
+        self.enable_cdp_events = enable_cdp_events
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.metrics = metrics
+        self.lite = lite
+        self._idle = []
+        self._by_driver = {}
+        self._cond = threading.Condition()
+        for i in range(self.size):
+            profile_dir = os.path.join(profile_root, f"session-{i + 1}") if profile_root else None
+            self._idle.append(Session(f"session-{i + 1}", profile_dir))
+
+    def _start(self, session):
+        if session.profile_dir:
+            os.makedirs(session.profile_dir, exist_ok=True)
+        start = time.time()
+        session.driver = create_chrome(self.enable_cdp_events, self.version_main, session.profile_dir, self.lite)
+        session.pages = 0
+        session.started_at = time.time()
+        session._count_pages()
+        self._record("session_starts")
+        if self.metrics:
+            self.metrics.observe("session.start", session.started_at - start)
+        logging.info(f"[{session.name}] Browser started in {session.started_at - start:.1f}s")
+
+    def _stop(self, session, reason):
+        if session.driver is None:
+            return
+        logging.info(f"[{session.name}] Recycling browser after {session.pages} pages ({reason})")
+        self._record("session_recycles", reason=reason)
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+        session.driver = None
+
+    def _record(self, name, **labels):
+        if self.metrics:
+            self.metrics.incr(name, **labels)
+
+    def memory_mb(self, session):
+        mb = process_tree_rss_mb(browser_pid(session.driver))
+        if self.metrics:
+            self.metrics.set_gauge("browser_rss_mb", round(mb, 1), session=session.name)
+        return mb
+
+    def healthy(self, session):
+        if session.driver is None:
+            return False
+        try:
+            session.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def warm(self):
+        # Start every idle browser up front instead of on first lease.
+        with self._cond:
+            sessions = list(self._idle)
+        for session in sessions:
+            if session.driver is None:
+                self._start(session)
+
+    def lease(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._idle, timeout):
+                raise TimeoutError("No browser session became free")
+            session = self._idle.pop(0)
+        try:
+            if session.driver is not None and not self.healthy(session):
+                self._stop(session, "unhealthy")
+            if session.driver is None:
+                self._start(session)
+        except Exception:
+            with self._cond:
+                self._idle.append(session)
+                self._cond.notify()
+            raise
+        session.leases += 1
+        with self._cond:
+            self._by_driver[id(session.driver)] = session
+        return session
+
+    def release(self, session_or_driver, broken=False):
+        with self._cond:
+            driver = session_or_driver.driver if isinstance(session_or_driver, Session) else session_or_driver
+            session = self._by_driver.pop(id(driver), None)
+        if session is None:
+            return
+        if broken:
+            self._stop(session, "broken")
+        elif self.max_pages and session.pages >= self.max_pages:
+            self._stop(session, "page limit")
+        elif self.max_memory_mb and self.memory_mb(session) >= self.max_memory_mb:
+            self._stop(session, "memory")
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            sessions = list(self._idle) + list(self._by_driver.values())
+            self._idle = []
+            self._by_driver = {}
+        for session in sessions:
+            if session.driver is not None:
+                try:
+                    session.driver.quit()
+                except Exception:
+                    pass
+                session.driver = None
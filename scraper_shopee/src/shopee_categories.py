@@ -1,86 +1,224 @@
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from tqdm import tqdm
-import csv, time, random
-
-options = uc.ChromeOptions()
-options.add_argument("--disable-blink-features=AutomationControlled")
-driver = uc.Chrome(options=options)
-
-url = "https://banhang.shopee.vn/edu/category-guide/"
-driver.get(url)
-
-wait = WebDriverWait(driver, 20)
-
-def scrape_current_page():
-    rows = driver.find_elements(By.CSS_SELECTOR, "tr.shopee-table__row")
-    data_list = []
-    for row in rows:
-        cols = row.find_elements(By.TAG_NAME, "td")
-        if len(cols) < 7:
-            continue
-        def safe_text(col_idx):
-            try:
-                return cols[col_idx].text.strip()
-            except:
-                return ""
-        record = {
-            "nganh_cap_1": safe_text(0),
-            "nganh_cap_2": safe_text(1),
-            "nganh_cap_3": safe_text(2),
-            "nganh_cap_4": safe_text(3),
-            "nganh_cap_5": safe_text(4),
-            "ma_nganh": safe_text(5),
-            "mo_ta_vi_du": safe_text(6),
-        }
-        data_list.append(record)
-    return data_list
-
-wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "tr.shopee-table__row")))
-
-all_data = []
-page = 1
-pbar = tqdm(desc="Collecting data", unit="page")
-
-while True:
-    pbar.set_description(f"Pages {page}")
-    page_data = scrape_current_page()
-    all_data.extend(page_data)
-    pbar.update(1)
-
-    if page % 5 == 0:
-        with open("shopee_categories_temp.csv", "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=all_data[0].keys())
-            writer.writeheader()
-            writer.writerows(all_data)
-        print(f"Saves {len(all_data)} rows.")
-    try:
-        next_btn = driver.find_element(By.CSS_SELECTOR, "button.shopee-pager__button-next")
+import os, sys, csv, json, logging, argparse
+from sessions import create_chrome
+from pacing import Pacer, document_ready
+from category_index import ID_FIELD, LEVELS, category_path
+
+URL = "https://banhang.shopee.vn/edu/category-guide/"
+FIELDS = list(LEVELS) + [ID_FIELD, "mo_ta_vi_du"]
+ROW_SELECTOR = "tr.shopee-table__row"
+
+
+def read_rows(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def write_rows(path, rows, fields=FIELDS):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def diff_categories(old_rows, new_rows):
+    old = {r[ID_FIELD]: r for r in old_rows}
+    new = {r[ID_FIELD]: r for r in new_rows}
+    changes = []
+    for cid, row in new.items():
+        if cid not in old:
+            changes.append(dict(row, change="added"))
+        elif category_path(row) != category_path(old[cid]) or row.get("mo_ta_vi_du", "") != old[cid].get("mo_ta_vi_du", ""):
+            changes.append(dict(row, change="renamed"))
+    for cid, row in old.items():
+        if cid not in new:
+            changes.append(dict(row, change="removed"))
+    return changes
+
+
+def apply_changes(old_rows, new_rows, changes):
+    # Keeps the existing row order; new categories go at the end in crawl order.
+    by_kind = {}
+    for c in changes:
+        by_kind.setdefault(c["change"], set()).add(c[ID_FIELD])
+    new = {r[ID_FIELD]: r for r in new_rows}
+    rows = [new[r[ID_FIELD]] if r[ID_FIELD] in by_kind.get("renamed", ()) else r
+            for r in old_rows if r[ID_FIELD] not in by_kind.get("removed", ())]
+    rows += [r for r in new_rows if r[ID_FIELD] in by_kind.get("added", ())]
+    return rows
+
+
+class CategoryCrawler:
+    """Walks the paginated category guide, appending every page's rows to a
+    work file and checkpointing the last completed page, so an interrupted
+    crawl resumes where it stopped instead of at page 1."""
+
+    def __init__(self, output="shopee_categories.csv", driver=None, pacer=None):
+        self.output = output
+        base = os.path.splitext(output)[0]
+        self.work_path = base + "_temp.csv"
+        self.checkpoint_path = base + ".checkpoint.json"
+        self.diff_path = base + ".diff.csv"
+        self.driver = driver
+        self.pacer = pacer or Pacer(delays={"category_page": (1.5, 3.0)})
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            if os.path.exists(self.work_path):
+                os.remove(self.work_path)
+            return 0, [], False
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        # Rows appended after the last checkpoint belong to an unfinished page.
+        rows = read_rows(self.work_path)[:checkpoint["rows"]]
+        write_rows(self.work_path, rows)
+        return checkpoint["page"], rows, checkpoint.get("complete", False)
+
+    def _save_checkpoint(self, page, rows, complete=False):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"page": page, "rows": rows, "complete": complete}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _append_rows(self, rows):
+        new_file = not os.path.exists(self.work_path)
+        with open(self.work_path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def scrape_current_page(self):
+        rows = self.driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR)
+        data_list = []
+        for row in rows:
+            cols = row.find_elements(By.TAG_NAME, "td")
+            if len(cols) < 7:
+                continue
+            def safe_text(col_idx):
+                try:
+                    return cols[col_idx].text.strip()
+                except:
+                    return ""
+            record = {
+                "nganh_cap_1": safe_text(0),
+                "nganh_cap_2": safe_text(1),
+                "nganh_cap_3": safe_text(2),
+                "nganh_cap_4": safe_text(3),
+                "nganh_cap_5": safe_text(4),
+                "ma_nganh": safe_text(5),
+                "mo_ta_vi_du": safe_text(6),
+            }
+            data_list.append(record)
+        return data_list
+
+    def _next_page(self):
+        try:
+            next_btn = self.driver.find_element(By.CSS_SELECTOR, "button.shopee-pager__button-next")
+        except Exception:
+            return False
         class_attr = next_btn.get_attribute("class")
         if not next_btn.is_enabled() or (class_attr and "disabled" in class_attr):
-            print("End of pages. No more data to collect.")
-            break
-
-        driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
-        time.sleep(0.5)
+            return False
+        first_row = self.driver.find_element(By.CSS_SELECTOR, ROW_SELECTOR)
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
         next_btn.click()
+        if not self.pacer.wait(self.driver, EC.staleness_of(first_row), "category_page", timeout=20):
+            raise RuntimeError("Category table did not change after clicking next")
+        self.pacer.wait(self.driver, EC.presence_of_element_located((By.CSS_SELECTOR, ROW_SELECTOR)), "category_page", timeout=20)
+        return True
+
+    def _skip_to(self, page):
+        # Resuming only clicks through already-saved pages; nothing is re-read.
+        for current in range(1, page):
+            if not self._next_page():
+                raise RuntimeError(f"Category guide ended at page {current} while resuming at page {page}")
 
-        time.sleep(random.uniform(1.5, 3.0))
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "tr.shopee-table__row")))
-        page += 1
+    def crawl(self):
+        done_pages, rows, complete = self._load_checkpoint()
+        if complete:
+            logging.info(f"Using the finished crawl in {self.work_path} ({len(rows)} rows)")
+            return rows
+        if done_pages:
+            logging.info(f"Resuming after page {done_pages} ({len(rows)} rows saved)")
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.driver = create_chrome()
+        try:
+            self.driver.get(URL)
+            self.pacer.wait(self.driver, document_ready, "page_ready")
+            self.pacer.wait(self.driver, EC.presence_of_element_located((By.CSS_SELECTOR, ROW_SELECTOR)), "category_page", timeout=20)
+            page = 1
+            if done_pages:
+                self._skip_to(done_pages + 1)
+                page = done_pages + 1
+            with tqdm(desc="Collecting data", unit="page", initial=done_pages) as pbar:
+                while True:
+                    pbar.set_description(f"Pages {page}")
+                    page_rows = self.scrape_current_page()
+                    self._append_rows(page_rows)
+                    rows.extend(page_rows)
+                    self._save_checkpoint(page, len(rows))
+                    pbar.update(1)
+                    if not self._next_page():
+                        self._save_checkpoint(page, len(rows), complete=True)
+                        logging.info("End of pages. No more data to collect.")
+                        break
+                    self.pacer.delay("category_page")
+                    page += 1
+        finally:
+            if owns_driver:
+                self.driver.quit()
+                self.driver = None
+        return rows
 
-    except Exception as e:
-        print(f"No other pages or error: {e}")
-        break
+    def finish(self, rows, update=True):
+        old_rows = read_rows(self.output)
+        if not old_rows:
+            write_rows(self.output, rows)
+            logging.info(f"Complete! Saved {len(rows)} rows to {self.output}")
+            changes = []
+        else:
+            changes = diff_categories(old_rows, rows)
+            counts = {kind: sum(1 for c in changes if c["change"] == kind) for kind in ("added", "removed", "renamed")}
+            logging.info(f"Category changes vs {self.output}: {counts}")
+            if changes:
+                write_rows(self.diff_path, changes, ["change"] + FIELDS)
+                logging.info(f"Wrote {len(changes)} changes to {self.diff_path}")
+                if update:
+                    write_rows(self.output, apply_changes(old_rows, rows, changes))
+                    logging.info(f"Updated {self.output}")
+        for path in (self.checkpoint_path, self.work_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return changes
 
-driver.quit()
-pbar.close()
+    def run(self, update=True):
+        return self.finish(self.crawl(), update)
 
-with open("shopee_categories.csv", "w", encoding="utf-8", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=all_data[0].keys())
-    writer.writeheader()
-    writer.writerows(all_data)
 
-print(f"Complete! Saved {len(all_data)} rows.")
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Crawl Shopee's category guide into shopee_categories.csv")
+    parser.add_argument("-o", "--output", default="shopee_categories.csv", help="Category CSV to create or refresh")
+    parser.add_argument("--restart", action="store_true", default=False, help="Ignore the checkpoint and start again at page 1")
+    parser.add_argument("--diff-only", action="store_true", default=False, help="Only write the list of changes, leave the CSV as it is")
+    args = parser.parse_args()
+    crawler = CategoryCrawler(args.output)
+    if args.restart:
+        for path in (crawler.checkpoint_path, crawler.work_path):
+            if os.path.exists(path):
+                os.remove(path)
+    crawler.run(update=not args.diff_only)
@@ -0,0 +1,196 @@
+import re
+import sys
+import json
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import lxml.html
+from extractors import SELECTORS, normalize_record, parse_rating_filters, finish_review
+from snapshots import read_manifest, load_snapshot
+from product_store import review_key
+
+# Offline stage: turns the snapshots written by `retriv_data.py --capture-only`
+# into the same product/review dicts the live scraper produces.
+
+
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "details", "dialog", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "main", "nav", "ol", "p", "pre", "section", "summary", "table", "tr", "ul",
+}
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head", "title"}
+_SPACES = re.compile(r"[ \t\r\n\f]+")
+_PRE = re.compile(r"white-space\s*:\s*pre")
+_HIDDEN = re.compile(r"display\s*:\s*none")
+
+
+def inner_text(node):
+    """Approximates Selenium's element .text (WebDriver's visible text):
+    <br> and block elements break lines, whitespace collapses unless the
+    element is styled white-space: pre*, and every line is trimmed."""
+    lines = [""]
+
+    def break_line():
+        if lines[-1].strip():
+            lines.append("")
+
+    def add_text(text, pre):
+        if not text:
+            return
+        if pre:
+            parts = text.replace("\r\n", "\n").split("\n")
+            lines[-1] += parts[0]
+            lines.extend(parts[1:])
+            return
+        text = _SPACES.sub(" ", text)
+        if not lines[-1].strip() or lines[-1].endswith(" "):
+            text = text.lstrip(" ")
+        lines[-1] += text
+
+    def walk(el, pre):
+        tag = el.tag.lower() if isinstance(el.tag, str) else None
+        if tag is None or tag in HIDDEN_TAGS or _HIDDEN.search(el.get("style") or ""):
+            return
+        if tag == "br":
+            lines.append("")
+            return
+        pre = pre or tag == "pre" or bool(_PRE.search(el.get("style") or ""))
+        block = tag in BLOCK_TAGS
+        if block:
+            break_line()
+        add_text(el.text, pre)
+        for child in el:
+            walk(child, pre)
+            # A child's tail is text of this element, styled like it.
+            add_text(child.tail, pre)
+        if block:
+            break_line()
+
+    walk(node, False)
+    return "\n".join(line.strip(" \t\r\n\f") for line in lines).strip().replace("\xa0", " ")
+
+
+def _read_node(node, how):
+    if how == "text":
+        return inner_text(node)
+    if how == "textContent":
+        return node.text_content()
+    return node.get(how)
+
+
+def _read_field(ctx, field):
+    found = ctx.xpath(field["xpath"])
+    if field["read"] == "count":
+        return len(found)
+    if field["read"] == "texts":
+        return [inner_text(n) for n in found]
+    if not found:
+        return None
+    return _read_node(found[0], field["read"])
+
+
+def parse_html(html, spec_name):
+    spec = SELECTORS[spec_name]
+    root = lxml.html.fromstring(html)
+    if spec["container"]:
+        containers = root.xpath(spec["container"])
+        if not containers:
+            return None
+        root = containers[0]
+    items = root.xpath(spec["item"]) if spec["item"] else [root]
+    return [normalize_record(spec_name, {name: _read_field(item, f) for name, f in spec["fields"].items()}) for item in items]
+
+
+def parse_entry(args):
+    root, entry = args
+    try:
+        html = load_snapshot(root, entry)
+        if entry["kind"] == "search":
+            return entry, parse_html(html, "product_list") or []
+        if entry["kind"] == "pdp":
+            records = parse_html(html, "product_detail")
+            return entry, records[0]
+        if entry["kind"] == "review":
+            return entry, [finish_review(r) for r in parse_html(html, "review") or []]
+    except Exception as e:
+        logging.warning(f"Could not parse snapshot {entry['file']}: {e}")
+    return entry, None
+
+
+def build_products(root, processes=None, chunksize=16):
+    entries = list(read_manifest(root))
+    cards = {}
+    card_order = []
+    details = {}
+    review_pages = {}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for entry, result in pool.map(parse_entry, [(root, e) for e in entries], chunksize=chunksize):
+            if result is None:
+                continue
+            meta = entry["meta"]
+            if entry["kind"] == "search":
+                for card in result:
+                    link = card["link"]
+                    if link and link not in cards:
+                        cards[link] = card
+                        card_order.append((meta.get("page", 0), len(card_order), link))
+            elif entry["kind"] == "pdp":
+                details[meta["link"]] = (meta, result)
+            elif entry["kind"] == "review":
+                review_pages.setdefault(meta["link"], []).append((meta.get("star") or 0, meta.get("page", 0), meta.get("quota"), result))
+
+    index_category = _search_category(entries)
+    products = []
+    for _, _, link in sorted(card_order):
+        product = cards[link]
+        if link in details:
+            meta, page = details[link]
+            product["category"] = meta.get("category_info") or page["category"]
+            product["description"] = page["description"]
+            product["detailed_rating"], product["total_rating"] = parse_rating_filters(page["rating_filters"])
+            product["comments"] = _collect_reviews(review_pages.get(link, []))
+        elif index_category:
+            product["category"] = index_category
+        products.append(product)
+    return products
+
+
+def _collect_reviews(pages):
+    # Like the live pager: reviews are deduplicated within each star filter and
+    # cut at the quota recorded at capture time (older captures have none).
+    comments = []
+    seen = {}
+    # Star-filtered captures are numbered 5..1 on the page; keep that order.
+    for star, _, quota, reviews in sorted(pages, key=lambda p: (-p[0], p[1])):
+        keys = seen.setdefault(star, set())
+        for review in reviews:
+            key = review_key(review)
+            if key in keys or (quota is not None and len(keys) >= quota):
+                continue
+            keys.add(key)
+            comments.append(review)
+    return comments
+
+
+def _search_category(entries):
+    for entry in entries:
+        if entry["kind"] == "search" and entry["meta"].get("category_info"):
+            return entry["meta"]["category_info"]
+    return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    parser = argparse.ArgumentParser(description="Parse captured Shopee snapshots into product JSON")
+    parser.add_argument("capture_dir", help="Directory written by retriv_data.py --capture-only")
+    parser.add_argument("-o", "--output", required=True, help="Output JSON file")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Parser processes (default: CPU count)")
+    args = parser.parse_args()
+    products = build_products(args.capture_dir, processes=args.processes)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+    logging.info(f"Parsed {len(products)} products into {args.output}")
@@ -0,0 +1,51 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+
+# Raw page_source captures for the offline parser. Each snapshot is a gzip
+# file under <root>/<kind>/ and is described by one line in manifest.jsonl:
+#   {"file": ..., "kind": "search"|"pdp"|"review", "url": ..., "meta": {...}, "captured_at": ...}
+
+
+class SnapshotWriter:
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def captured_links(self):
+        return {entry["meta"].get("link") for entry in read_manifest(self.root) if entry["kind"] == "pdp"}
+
+    def save(self, kind, url, html, meta=None):
+        meta = meta or {}
+        key = hashlib.sha1(json.dumps([kind, url, meta], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        rel_path = os.path.join(kind, f"{key}.html.gz")
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+        entry = {"file": rel_path, "kind": kind, "url": url, "meta": meta, "captured_at": time.time()}
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return path
+
+
+def read_manifest(root):
+    path = os.path.join(root, "manifest.jsonl")
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def load_snapshot(root, entry):
+    with gzip.open(os.path.join(root, entry["file"]), "rt", encoding="utf-8") as f:
+        return f.read()
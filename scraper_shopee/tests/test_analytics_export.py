@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+import analytics_export
+
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def _products(count):
+    return [{
+        "link": f"https://shopee.ph/Item-{i}-i.1000.{i}",
+        "name": f"Item {i}",
+        "price": "₱1,499",
+        "detailed_rating": {"5_star": 3},
+        "comments": [{"author": f"buyer_{i}", "rating": 5, "content": "ok", "time": "2025-10-01 12:00"}],
+    } for i in range(count)]
+
+
+def _rows(root):
+    return ds.dataset(root, format="parquet", partitioning="hive").count_rows()
+
+
+def test_reexport_replaces_partitions(tmp_path):
+    source = tmp_path / "shopee_head phones.json"
+    source.write_text(json.dumps(_products(10)), encoding="utf-8")
+    out = str(tmp_path / "dataset")
+
+    for _ in range(2):
+        assert analytics_export.export(str(source), out, "head phones", "2025-10-01", batch_size=4) == (10, 10)
+    assert _rows(os.path.join(out, "products")) == 10
+    assert _rows(os.path.join(out, "reviews")) == 10
+
+    source.write_text(json.dumps(_products(3)), encoding="utf-8")
+    analytics_export.export(str(source), out, "head phones", "2025-10-01", batch_size=4)
+    assert _rows(os.path.join(out, "products")) == 3
@@ -0,0 +1,27 @@
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+from metrics import Metrics
+from retriv_data import ProductScraper
+
+
+class NoApiCapture:
+    def clear(self):
+        pass
+
+    def wait_for(self, kind, timeout=0):
+        return []
+
+
+def test_api_fallback_reads_the_open_page_without_reloading(tmp_path):
+    scraper = ProductScraper("test", 1, False, 10, metrics=Metrics(), output_file=str(tmp_path / "out.json"))
+    opened, read = [], []
+    scraper._open_product = lambda driver, link, worker_name=None: opened.append(link)
+    scraper._read_product_details = lambda driver, product: read.append(product["link"])
+    driver = type("Driver", (), {"api_capture": NoApiCapture()})()
+
+    scraper._get_product_details_api(driver, {"link": "https://shopee.ph/a-i.1.2"})
+
+    assert opened == read == ["https://shopee.ph/a-i.1.2"]
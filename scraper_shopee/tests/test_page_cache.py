@@ -0,0 +1,36 @@
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, os.path.join(HERE, "..", "benchmarks"))
+import fixtures
+from metrics import Metrics
+from page_cache import PageCache
+from retriv_data import ProductScraper
+
+BASE_URL = "https://shopee.ph"
+SHOPID, ITEMID = 1000, 7
+
+
+def _scraper(cache, review_limit):
+    return ProductScraper("test", 1, False, review_limit, cache=cache, metrics=Metrics(), base_url=BASE_URL)
+
+
+def test_cached_product_with_zero_review_quota(tmp_path):
+    cache = PageCache(str(tmp_path))
+    link = fixtures.product_link(BASE_URL, SHOPID, ITEMID)
+    cache.put("pdp", link, fixtures.product_page_html(BASE_URL, SHOPID, ITEMID))
+    product = {"link": link}
+
+    assert _scraper(cache, 0)._details_from_cache(product)
+    assert product["comments"] == []
+    assert product["total_rating"] > 0
+    cache.close()
+
+
+def test_zero_quota_needs_no_review_pages(tmp_path):
+    cache = PageCache(str(tmp_path))
+    link = fixtures.product_link(BASE_URL, SHOPID, ITEMID)
+    assert _scraper(cache, 10)._cached_reviews(link, 0) == ([], None)
+    cache.close()
@@ -0,0 +1,90 @@
+import os
+import sys
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+from product_store import review_key
+from review_pager import ReviewPager, _PAGER_JS
+
+
+class FakePacer:
+    def wait(self, driver, condition, phase):
+        return condition(driver)
+
+    def delay(self, phase):
+        pass
+
+
+class FakeButton:
+    def __init__(self, driver, page):
+        self.driver = driver
+        self.page = page
+
+    def click(self):
+        self.driver.page = self.page
+
+
+class FakeDriver:
+    """A review list of `pages` (lists of reviews) behind a numbered pager."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.loads = 1
+
+    def execute_script(self, script):
+        if script == _PAGER_JS:
+            return {"active": self.page + 1, "pages": list(range(1, len(self.pages) + 1)), "has_next": self.page + 1 < len(self.pages)}
+        first = self.pages[self.page][0]
+        return f"{self.page}|{first['author']}"
+
+    def find_element(self, by, value):
+        if '"' not in value:
+            return object()
+        self.loads += 1
+        return FakeButton(self, int(value.split('"')[-2]) - 1)
+
+    def find_elements(self, by, value):
+        return []
+
+
+def _review(n, day):
+    return {"author": f"buyer_{n}", "time": f"2025-10-{day:02d} 12:00 | Variation: Default", "content": f"review {n}"}
+
+
+def _pager(driver):
+    return ReviewPager(driver, FakePacer(), lambda limit: driver.pages[driver.page][:limit])
+
+
+def test_refresh_stops_at_a_page_older_than_the_stored_reviews():
+    # Two new reviews on top, then the stored review and reviews older than any run's limit.
+    pages = [
+        [_review(1, 20), _review(2, 19), _review(3, 10), _review(4, 9), _review(5, 8), _review(6, 7)],
+        [_review(7, 6), _review(8, 5), _review(9, 4), _review(10, 3), _review(11, 2), _review(12, 1)],
+        [_review(13, 1)] * 6,
+    ]
+    driver = FakeDriver(pages)
+    known = {review_key(pages[0][2])}
+    newest = datetime(2025, 10, 10, 12, 0).timestamp()
+
+    reviews = _pager(driver).collect(5, known_keys=known, newer_than=newest)
+
+    assert [r["author"] for r in reviews] == ["buyer_1", "buyer_2"]
+    # Page 2 holds only older reviews, so page 3 is never loaded.
+    assert driver.loads == 2
+
+
+def test_new_reviews_below_the_first_page_are_still_found():
+    pages = [
+        [_review(1, 20), _review(3, 10), _review(4, 9), _review(5, 8), _review(6, 7), _review(7, 6)],
+        [_review(2, 19), _review(8, 5), _review(9, 4), _review(10, 3), _review(11, 2), _review(12, 1)],
+        [_review(13, 5), _review(14, 4), _review(15, 3), _review(16, 2), _review(17, 1), _review(18, 1)],
+    ]
+    driver = FakeDriver(pages)
+    newest = datetime(2025, 10, 10, 12, 0).timestamp()
+
+    reviews = _pager(driver).collect(5, known_keys={review_key(pages[0][1])}, newer_than=newest)
+
+    assert [r["author"] for r in reviews] == ["buyer_1", "buyer_2"]
+    assert driver.loads == 3
@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+from captcha import CaptchaBlocked
+from metrics import Metrics
+from pacing import Pacer, DEFAULT_DELAYS
+from retriv_data import ProductScraper
+
+
+class BlockedDriver:
+    current_url = "https://shopee.ph/verify/captcha?next=%2Fsearch"
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+    def implicitly_wait(self, seconds):
+        pass
+
+
+def test_handoff_leaves_the_sink_synced_and_closed(tmp_path):
+    output = str(tmp_path / "shopee_test.json")
+    pacer = Pacer(delays={phase: (0.0, 0.0) for phase in DEFAULT_DELAYS}, adaptive=False)
+    scraper = ProductScraper("test", 5, True, 0, pacer=pacer, metrics=Metrics(), output_file=output, captcha_handoff=True)
+    scraper.sink.append({"link": "https://shopee.ph/a-i.1.2", "name": "a"})
+
+    with pytest.raises(CaptchaBlocked):
+        scraper.run(BlockedDriver())
+
+    assert scraper.sink._file is None
+    with open(output + "l", "r", encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == ["a"]
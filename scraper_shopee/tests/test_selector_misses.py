@@ -0,0 +1,29 @@
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, os.path.join(HERE, "..", "benchmarks"))
+import fixtures
+from metrics import Metrics
+from retriv_data import ProductScraper
+from snapshot_parser import parse_html
+from extractors import finish_review
+
+
+def _misses(metrics):
+    return {c["field"]: c["value"] for c in metrics.report()["counters"] if c["name"] == "selector_miss"}
+
+
+def test_optional_review_fields_are_not_misses():
+    metrics = Metrics()
+    scraper = ProductScraper("test", 1, False, 10, metrics=metrics)
+    reviews = [finish_review(r) for r in parse_html(fixtures.product_page_html("https://shopee.ph", 1000, 7), "review")]
+    assert any(r["like_count"] == 0 for r in reviews)
+    assert any(not r["seller_respond"] for r in reviews)
+
+    scraper._count_misses("review", reviews)
+    assert _misses(metrics) == {}
+
+    scraper._count_misses("review", [dict(reviews[0], author="")])
+    assert _misses(metrics) == {"author": 1}
@@ -0,0 +1,42 @@
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, os.path.join(HERE, "..", "benchmarks"))
+import fixtures
+from snapshots import SnapshotWriter
+from snapshot_parser import build_products
+
+BASE_URL = "https://shopee.ph"
+SHOPID, ITEMID = 1000, 1
+
+
+def _capture(root, review_pages, quota):
+    writer = SnapshotWriter(root)
+    writer.save("search", f"{BASE_URL}/search?keyword=mock", fixtures.search_page_html(BASE_URL, 0, per_page=1), {"page": 0})
+    link = fixtures.product_link(BASE_URL, SHOPID, ITEMID)
+    writer.save("pdp", link, fixtures.product_page_html(BASE_URL, SHOPID, ITEMID), {"link": link})
+    for page in review_pages:
+        meta = {"link": link, "page": page, "star": None}
+        if quota is not None:
+            meta["quota"] = quota
+        writer.save("review", link, fixtures.product_page_html(BASE_URL, SHOPID, ITEMID, review_page=page), meta)
+
+
+def _comments(root):
+    products = build_products(root, processes=1)
+    assert len(products) == 1
+    return products[0]["comments"]
+
+
+def test_reviews_are_cut_at_the_captured_quota(tmp_path):
+    _capture(str(tmp_path), [0, 1], quota=10)
+    comments = _comments(str(tmp_path))
+    assert len(comments) == 10
+    assert [c["author"] for c in comments] == [f"buyer_{ITEMID}_{i}" for i in range(10)]
+
+
+def test_repeated_review_pages_are_deduplicated(tmp_path):
+    _capture(str(tmp_path), [0, 0, 1], quota=None)
+    assert len(_comments(str(tmp_path))) == 12